@@ -0,0 +1,64 @@
+import threading
+import time
+import timeit
+
+
+# HANDLE THE TRAINING OF THE AGENT IN A BACKGROUND THREAD, WHILE THE SIMULATION RUNS IN THE MAIN ONE
+# train_fn trains one batch and returns False if there was nothing to train on,
+# publish_fn copies the trained weights to the network used by the actor, every publish_interval batches
+class AsyncLearner:
+    def __init__(self, train_fn, publish_fn, publish_interval=100, idle_sleep=0.01):
+        self._train_fn = train_fn
+        self._publish_fn = publish_fn
+        self._publish_interval = publish_interval
+        self._idle_sleep = idle_sleep  # seconds to wait when the memory is still empty
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._error = None
+        self._steps = 0
+        self._busy_time = 0
+
+    # START THE LEARNER THREAD, IF IT IS NOT ALREADY RUNNING
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="learner", daemon=True)
+        self._thread.start()
+
+    # STOP THE LEARNER THREAD AND PUBLISH THE LAST WEIGHTS
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self._publish_fn()
+        self.check()
+
+    # RAISE IN THE CALLER THE ERROR THAT STOPPED THE LEARNER, IF ANY
+    def check(self):
+        if self._error is not None:
+            raise RuntimeError("the learner thread failed") from self._error
+
+    def _loop(self):
+        try:
+            while not self._stop_event.is_set():
+                start = timeit.default_timer()
+                if not self._train_fn():
+                    time.sleep(self._idle_sleep)
+                    continue
+                self._busy_time += timeit.default_timer() - start
+                self._steps += 1
+                if self._steps % self._publish_interval == 0:
+                    self._publish_fn()
+        except Exception as error:
+            self._error = error
+
+    @property
+    def steps(self):
+        return self._steps
+
+    @property
+    def busy_time(self):
+        return self._busy_time
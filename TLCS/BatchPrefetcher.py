@@ -0,0 +1,60 @@
+import queue
+import threading
+import time
+import timeit
+
+
+# HANDLE THE PREPARATION OF THE REPLAY BATCHES IN A BACKGROUND THREAD
+# up to depth batches are sampled from the memory in advance, so sampling and copying overlap with the training;
+# the time the training spends waiting for a batch is accumulated in stall_time
+class BatchPrefetcher:
+    def __init__(self, memory, batch_size, depth=4, idle_sleep=0.01):
+        self._memory = memory
+        self._batch_size = batch_size
+        self._queue = queue.Queue(maxsize=depth)
+        self._idle_sleep = idle_sleep  # seconds to wait when the memory is still empty
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._stall_time = 0
+
+    # START THE PREFETCHING THREAD, IF IT IS NOT ALREADY RUNNING
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="prefetcher", daemon=True)
+        self._thread.start()
+
+    # STOP THE PREFETCHING THREAD AND DROP THE PREPARED BATCHES
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    # RETURN THE NEXT BATCH, AS RETURNED BY memory.sample_batch
+    def get(self):
+        start = timeit.default_timer()
+        batch = self._queue.get()
+        self._stall_time += timeit.default_timer() - start
+        return batch
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            if len(self._memory) == 0:
+                time.sleep(self._idle_sleep)
+                continue
+            batch = self._memory.sample_batch(self._batch_size)
+            while not self._stop_event.is_set():
+                try:
+                    self._queue.put(batch, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    @property
+    def stall_time(self):
+        return self._stall_time
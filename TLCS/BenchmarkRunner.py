@@ -0,0 +1,71 @@
+import timeit
+
+from SimRunner import SimRunner
+
+# timed phases of an episode, in the order they are reported
+PHASES = ["route_generation", "sumo_startup", "simulation_step", "update_waiting_time", "get_state", "get_waiting_times",
+          "choose_action", "replay_sample", "replay_train", "sumo_shutdown"]
+
+
+# SIMRUNNER THAT MEASURES THE TIME SPENT IN EVERY PHASE OF AN EPISODE
+# every phase keeps the total seconds and the number of calls of the last episode;
+# replay_train is the single call that predicts the targets and trains, see Model.train_step
+# update_waiting_time is the per step update of the waiting time total, that get_waiting_times only reads
+class BenchmarkRunner(SimRunner):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._phase_times = {}
+        self._phase_calls = {}
+        self._episode_time = 0
+
+    # RUN ONE EPISODE AND RETURN ITS TIMINGS: {"episode_time": s, "phases": {phase: {"total": s, "calls": n}}}
+    def run(self, episode, seed=None):
+        self._phase_times = {phase: 0.0 for phase in PHASES}
+        self._phase_calls = {phase: 0 for phase in PHASES}
+        start = timeit.default_timer()
+        super().run(episode, seed)
+        self._episode_time = timeit.default_timer() - start
+        return self.timings
+
+    # CALL function AND ADD ITS DURATION TO phase
+    def _timed(self, phase, function, *args):
+        start = timeit.default_timer()
+        result = function(*args)
+        self._phase_times[phase] += timeit.default_timer() - start
+        self._phase_calls[phase] += 1
+        return result
+
+    def _generate_routes(self, seed):
+        return self._timed("route_generation", super()._generate_routes, seed)
+
+    def _start_sumo(self, sumoCmd):
+        self._timed("sumo_startup", super()._start_sumo, sumoCmd)
+
+    def _close_sumo(self):
+        self._timed("sumo_shutdown", super()._close_sumo)
+
+    def _simulation_step(self, until=None):
+        self._timed("simulation_step", super()._simulation_step, until)
+
+    def _update_waiting_time(self):
+        self._timed("update_waiting_time", super()._update_waiting_time)
+
+    def _get_state(self):
+        return self._timed("get_state", super()._get_state)
+
+    def _get_waiting_times(self):
+        return self._timed("get_waiting_times", super()._get_waiting_times)
+
+    def _choose_action(self, state):
+        return self._timed("choose_action", super()._choose_action, state)
+
+    def _sample_batch(self):
+        return self._timed("replay_sample", super()._sample_batch)
+
+    def _train_on_batch(self, batch):
+        self._timed("replay_train", super()._train_on_batch, batch)
+
+    @property
+    def timings(self):
+        phases = {phase: {"total": self._phase_times[phase], "calls": self._phase_calls[phase]} for phase in PHASES}
+        return {"episode_time": self._episode_time, "phases": phases}
@@ -0,0 +1,122 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+
+# HANDLE THE PERIODIC CHECKPOINTS OF A TRAINING RUN, TO RESUME IT WHERE IT STOPPED
+# every checkpoint is a folder "episode_<n>" in checkpoint_dir, n being the number of episodes done, with:
+#   model.npz  -> the value of every variable of the graph: the networks and the optimizer state
+#   memory/    -> one .npy file per array of the replay memory, that np.load can memory-map
+#   state.json -> the episode counter, the training steps of the model, the stats of the runner, the random generator states
+#                 and the number of chunks of the decision log, the ones written after the checkpoint are deleted on restore
+# the state is copied by save, between two episodes, and written by a background thread while the next episodes run;
+# the file "latest" names the last complete checkpoint and is replaced only once all of its files are written
+class Checkpointer:
+    def __init__(self, checkpoint_dir, keep=2):
+        self._checkpoint_dir = checkpoint_dir
+        self._keep = keep  # how many checkpoints are kept, the older ones are deleted
+        self._written = []  # names of the checkpoints of this run, oldest first: only they are deleted, never the ones of another run
+        self._thread = None
+        self._error = None
+
+    # COPY THE STATE OF THE TRAINING AFTER episode EPISODES AND WRITE IT IN THE BACKGROUND
+    # no training must happen during the call, see SimRunner.stop_training
+    def save(self, sess, episode, model, memory, sim_runner, decision_logger=None):
+        self.wait()  # one checkpoint written at a time
+        model_state = model.get_state(sess)
+        memory_state = memory.get_state()
+        state = {"episode": episode, "train_steps": model_state["train_steps"], "stats": sim_runner.get_stats(),
+                 "memory": {key: value for key, value in memory_state.items() if key != "arrays"},
+                 "numpy_random": self._random_state_to_json(np.random.get_state())}
+        if decision_logger is not None:  # every record of the episodes done is flushed at the end of its episode
+            state["decision_chunks"] = decision_logger.n_chunks
+        self._thread = threading.Thread(target=self._write, args=(episode, model_state["variables"], memory_state["arrays"], state), name="checkpoint", daemon=True)
+        self._thread.start()
+
+    # WAIT FOR THE CHECKPOINT BEING WRITTEN, RAISING IN THE CALLER THE ERROR THAT STOPPED IT, IF ANY
+    def wait(self):
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("the checkpoint could not be written") from error
+
+    def _write(self, episode, variables, arrays, state):
+        try:
+            os.makedirs(self._checkpoint_dir, exist_ok=True)
+            for entry in os.listdir(self._checkpoint_dir):  # left by a run that stopped while writing
+                if entry.startswith("partial_"):
+                    shutil.rmtree(os.path.join(self._checkpoint_dir, entry), ignore_errors=True)
+
+            # the files are written in a partial folder, renamed once complete
+            folder = tempfile.mkdtemp(prefix="partial_", dir=self._checkpoint_dir)
+            os.makedirs(os.path.join(folder, "memory"))
+            np.savez(os.path.join(folder, "model.npz"), **variables)
+            for array_name, array in arrays.items():
+                np.save(os.path.join(folder, "memory", array_name + ".npy"), array)
+            with open(os.path.join(folder, "state.json"), "w") as file:
+                json.dump(state, file)
+            name = "episode_{:06d}".format(episode)
+            shutil.rmtree(os.path.join(self._checkpoint_dir, name), ignore_errors=True)
+            os.rename(folder, os.path.join(self._checkpoint_dir, name))
+
+            fd, tmp_path = tempfile.mkstemp(dir=self._checkpoint_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as file:
+                file.write(name)
+            os.replace(tmp_path, os.path.join(self._checkpoint_dir, "latest"))
+            self._written = [old_name for old_name in self._written if old_name != name] + [name]
+            for old_name in self._written[:-self._keep]:
+                shutil.rmtree(os.path.join(self._checkpoint_dir, old_name), ignore_errors=True)
+            self._written = self._written[-self._keep:]
+        except Exception as error:
+            self._error = error
+
+    # DELETE EVERY CHECKPOINT OF THE FOLDER, TO CALL BEFORE A NEW TRAINING THAT DOES NOT RESUME FROM THEM
+    def clear(self):
+        self.wait()
+        shutil.rmtree(self._checkpoint_dir, ignore_errors=True)
+        self._written = []
+
+    # PATH OF THE LAST COMPLETE CHECKPOINT, None IF THERE IS NONE
+    def latest(self):
+        try:
+            with open(os.path.join(self._checkpoint_dir, "latest")) as file:
+                return os.path.join(self._checkpoint_dir, file.read().strip())
+        except FileNotFoundError:
+            return None
+
+    # LOAD THE LAST CHECKPOINT INTO THE MODEL, THE MEMORY AND THE RUNNER, RETURN THE NUMBER OF EPISODES DONE (None IF THERE IS NO CHECKPOINT)
+    # the decision log goes back to the checkpoint too, the episodes after it are run and logged again
+    def restore(self, sess, model, memory, sim_runner, decision_logger=None):
+        folder = self.latest()
+        if folder is None:
+            return None
+        with open(os.path.join(folder, "state.json")) as file:
+            state = json.load(file)
+        # the checkpoints up to this one belong to the training resumed, the next ones of the run replace them
+        self._written = sorted(name for name in os.listdir(self._checkpoint_dir) if name.startswith("episode_") and name <= os.path.basename(folder))
+        with np.load(os.path.join(folder, "model.npz")) as variables:
+            model.set_state(sess, {"variables": variables, "train_steps": state["train_steps"]})
+        memory_state = dict(state["memory"])
+        memory_state["arrays"] = {name[:-len(".npy")]: np.load(os.path.join(folder, "memory", name), mmap_mode="r")
+                                  for name in os.listdir(os.path.join(folder, "memory"))}
+        memory.set_state(memory_state)
+        sim_runner.set_stats(state["stats"])
+        np.random.set_state(self._random_state_from_json(state["numpy_random"]))
+        if decision_logger is not None and "decision_chunks" in state:
+            decision_logger.truncate(state["decision_chunks"])
+        return state["episode"]
+
+    # THE STATE OF THE GLOBAL NUMPY GENERATOR, ('MT19937', keys, pos, has_gauss, cached_gaussian), TO AND FROM JSON
+    @staticmethod
+    def _random_state_to_json(random_state):
+        return [random_state[0], random_state[1].tolist()] + list(random_state[2:])
+
+    @staticmethod
+    def _random_state_from_json(values):
+        return (values[0], np.array(values[1], dtype=np.uint32)) + tuple(values[2:])
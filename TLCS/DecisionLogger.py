@@ -0,0 +1,82 @@
+import os
+import tempfile
+
+import numpy as np
+
+# one column per recorded value of a decision
+COLUMNS = [("episode", np.int32), ("step", np.int32), ("action", np.int8), ("reward", np.float32),
+           ("queue", np.int32), ("waiting_time", np.float32), ("epsilon", np.float32), ("light", np.int16)]
+
+
+# HANDLE THE STREAMING LOG OF THE DECISIONS OF THE AGENT, ONE RECORD PER DECISION (AND PER TRAFFIC LIGHT OF A NETWORK)
+# the records are kept in preallocated columns and written as compressed npz chunks, "decisions_<n>.npz" in log_dir,
+# when chunk_size records are collected or flush is called, so a crash loses at most the records not flushed yet
+class DecisionLogger:
+    # append=False starts a new log, deleting the chunks already in log_dir; append=True continues it, e.g. for a resumed training
+    def __init__(self, log_dir, chunk_size=10000, append=False):
+        self._log_dir = log_dir
+        self._chunk_size = chunk_size
+        os.makedirs(log_dir, exist_ok=True)
+        self._columns = {name: np.empty(chunk_size, dtype=dtype) for name, dtype in COLUMNS}
+        self._size = 0
+        self._n_chunks = len(self._chunk_files(log_dir))  # the numbering continues after the chunks of the folder
+        if not append:  # the rows of an earlier run would be mixed with the ones of this run
+            self.truncate(0)
+
+    # ADD THE RECORD OF ONE DECISION
+    # light is the position of the traffic light in the topology, 0 for the single intersection
+    def log(self, episode, step, action, reward, queue, waiting_time, epsilon, light=0):
+        index = self._size
+        columns = self._columns
+        columns["episode"][index] = episode
+        columns["step"][index] = step
+        columns["action"][index] = action
+        columns["reward"][index] = reward
+        columns["queue"][index] = queue
+        columns["waiting_time"][index] = waiting_time
+        columns["epsilon"][index] = epsilon
+        columns["light"][index] = light
+        self._size += 1
+        if self._size == self._chunk_size:
+            self.flush()
+
+    # WRITE THE RECORDS COLLECTED SO FAR AS A NEW CHUNK - the file is renamed once complete, so readers never see a partial chunk
+    def flush(self):
+        if self._size == 0:
+            return
+        path = os.path.join(self._log_dir, "decisions_{:06d}.npz".format(self._n_chunks))
+        fd, tmp_path = tempfile.mkstemp(dir=self._log_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            np.savez_compressed(file, **{name: column[:self._size] for name, column in self._columns.items()})
+        os.replace(tmp_path, path)
+        self._n_chunks += 1
+        self._size = 0
+
+    # DELETE THE CHUNKS FROM THE n_chunks-TH ON, AND THE RECORDS NOT FLUSHED YET, THEN CONTINUE THE NUMBERING FROM THERE
+    # used to go back to a checkpoint, so that the decisions logged after it are not found twice
+    def truncate(self, n_chunks):
+        for name in self._chunk_files(self._log_dir):
+            if int(name[len("decisions_"):-len(".npz")]) >= n_chunks:
+                os.remove(os.path.join(self._log_dir, name))
+        self._n_chunks = n_chunks
+        self._size = 0
+
+    @staticmethod
+    def _chunk_files(log_dir):
+        return sorted(name for name in os.listdir(log_dir) if name.startswith("decisions_") and name.endswith(".npz"))
+
+    # READ EVERY CHUNK OF log_dir, RETURN ONE ARRAY PER COLUMN - can be called while a run is still writing
+    # a column missing from a chunk written by an older version ("light") is read as zeros
+    @staticmethod
+    def load(log_dir):
+        chunks = []
+        for name in DecisionLogger._chunk_files(log_dir):
+            with np.load(os.path.join(log_dir, name)) as chunk:
+                size = len(chunk["episode"])
+                chunks.append({column: chunk[column] if column in chunk.files else np.zeros(size, dtype=dtype) for column, dtype in COLUMNS})
+        return {column: np.concatenate([chunk[column] for chunk in chunks]) if chunks else np.empty(0, dtype=dtype) for column, dtype in COLUMNS}
+
+    # NUMBER OF CHUNKS WRITTEN IN log_dir, THE INDEX OF THE NEXT ONE
+    @property
+    def n_chunks(self):
+        return self._n_chunks
@@ -0,0 +1,161 @@
+import traci.constants as tc
+import numpy as np
+
+from SimBackend import SimBackend
+from NetTopology import NetTopology
+from StateEncoder import StateEncoder
+from WaitingTimeTracker import WaitingTimeTracker
+
+VEHICLE_VARS = [tc.VAR_LANEPOSITION, tc.VAR_LANE_ID, tc.VAR_ROAD_ID, tc.VAR_ACCUMULATED_WAITING_TIME]
+EDGE_VARS = [tc.LAST_STEP_VEHICLE_HALTING_NUMBER, tc.LAST_STEP_VEHICLE_NUMBER, tc.LAST_STEP_VEHICLE_ID_LIST]
+
+# sumo option: seconds of the past over which the accumulated waiting time of a car is counted, see WaitingTimeTracker
+WAITING_TIME_MEMORY = "--waiting-time-memory"
+
+
+# RETURN sumoCmd WITH A WAITING TIME MEMORY OF AT LEAST max_steps, ADDED IF MISSING
+# with a shorter memory sumo forgets the oldest waiting time of the cars, that the running total of the waiting time still has
+def with_waiting_time_memory(sumoCmd, max_steps):
+    for index, option in enumerate(sumoCmd):
+        if option == WAITING_TIME_MEMORY or option.startswith(WAITING_TIME_MEMORY + "="):
+            value = option.split("=", 1)[1] if "=" in option else sumoCmd[index + 1]
+            if float(value) < max_steps:
+                raise ValueError("{} is {} s, it must cover the {} steps of the episode".format(WAITING_TIME_MEMORY, value, max_steps))
+            return sumoCmd
+    return sumoCmd + [WAITING_TIME_MEMORY, str(max_steps)]
+
+
+# HOW MANY STEPS CAN BE SIMULATED IN ONE CALL FROM step, UP TO max_skip, WHEN NO CAR IS AROUND THE INTERSECTION
+# departures is sorted; a car departing at step d is inserted by the step simulated at time d, so the jump can reach d
+def idle_steps(departures, step, max_skip):
+    index = np.searchsorted(departures, step)
+    if index == len(departures):
+        return max_skip
+    return int(min(max_skip, departures[index] - step))
+
+
+# HANDLE ONE SUMO SIMULATION OF THE INTERSECTION: START AND STOP SUMO, SIMULATE THE STEPS, SET THE PHASES
+# AND READ THE STATE, THE WAITING TIME AND THE QUEUE FROM THE SUBSCRIPTION RESULTS
+# the traffic light, its incoming roads and its phases come from the topology of the net file, see NetTopology;
+# SimRunner adds the agent and its training on top of it, TrafficEnv exposes it as an environment
+class IntersectionSim:
+    def __init__(self, max_steps, green_duration, yellow_duration, backend=None, topology=None, state_encoder=None, fast_forward=False, label="default"):
+        self._max_steps = max_steps
+        self._green_duration = green_duration
+        self._yellow_duration = yellow_duration
+        self._backend = backend if backend is not None else SimBackend()
+        self._label = label  # name of the traci connection, tells apart the simulations of one process
+        self._conn = None  # connection to the running sumo, see SimBackend
+        self._steps = 0
+        self._vehicles = {}  # snapshot of the vehicles around the intersection: veh_id -> {variable: value}
+        self._sum_intersection_queue = 0
+        self._topology = topology if topology is not None else NetTopology.load()
+        self._tl_id = self._topology.traffic_lights[0]  # the controlled intersection
+        self._junction = self._topology.junction(self._tl_id)
+        self._incoming_roads = self._topology.incoming_edges(self._tl_id)
+        self._green_phases = self._topology.green_phases(self._tl_id)  # phase of every action
+        self._yellow_phases = self._topology.yellow_phases(self._tl_id)
+        self._state_encoder = state_encoder if state_encoder is not None else StateEncoder(self._topology, self._tl_id)
+        self._waiting_time = WaitingTimeTracker(self._incoming_roads)  # running total of the waiting time in the incoming roads
+        self._fast_forward = fast_forward  # jump over the stretches without cars in a single sumo call
+        self._departures = None  # sorted departure steps of the episode, needed to know how far to jump
+
+    # START SUMO AT STEP 0 AND SUBSCRIBE TO THE VARIABLES READ DURING THE EPISODE
+    def _start_sumo(self, sumoCmd):
+        self._conn = self._backend.start(with_waiting_time_memory(sumoCmd, self._max_steps), label=self._label)
+        self._subscribe()
+        self._steps = 0
+        self._sum_intersection_queue = 0
+        self._waiting_time.reset()
+
+    def _close_sumo(self):
+        self._conn.close()
+        self._conn = None
+
+    # HANDLE THE CORRECT NUMBER OF STEPS TO SIMULATE
+    def _simulate(self, steps_todo):
+        if (self._steps + steps_todo) >= self._max_steps:  # do not do more steps than the maximum number of steps
+            steps_todo = self._max_steps - self._steps
+        while steps_todo > 0:
+            n_steps = self._idle_steps(steps_todo)
+            if n_steps > 1:  # the incoming roads stay empty until the next departure: no car is queued meanwhile
+                self._simulation_step(self._steps + n_steps)  # simulate up to that time in sumo
+                intersection_queue = 0
+            else:
+                n_steps = 1
+                self._simulation_step()  # simulate 1 step in sumo
+                intersection_queue = self._get_stats()
+            self._update_waiting_time()
+            self._steps += n_steps  # update the step counter
+            steps_todo -= n_steps
+            self._sum_intersection_queue += intersection_queue
+            self._on_sim_steps(n_steps)
+
+    # CALLED AFTER EVERY CALL TO SUMO OF _simulate, WITH THE NUMBER OF STEPS IT SIMULATED - e.g. to train meanwhile
+    def _on_sim_steps(self, n_steps):
+        pass
+
+    # ADVANCE SUMO BY ONE STEP, OR UP TO THE STEP until
+    def _simulation_step(self, until=None):
+        if until is None:
+            self._conn.simulationStep()
+        else:
+            self._conn.simulationStep(float(until))
+
+    # ADD THE WAITING TIME OF THE LAST STEP, OR JUMP, TO THE RUNNING TOTAL, SEE WaitingTimeTracker
+    def _update_waiting_time(self):
+        self._waiting_time.update(self._conn)
+
+    # HOW MANY STEPS CAN BE SIMULATED AT ONCE: 1, UNLESS FAST FORWARD IS ON AND THERE IS NO CAR IN THE INCOMING ROADS OR WAITING TO BE INSERTED
+    def _idle_steps(self, max_skip):
+        if self._departures is None or self._conn.simulation.getSubscriptionResults()[tc.VAR_PENDING_VEHICLES]:
+            return 1
+        for road_id in self._incoming_roads:
+            if self._conn.edge.getSubscriptionResults(road_id)[tc.LAST_STEP_VEHICLE_NUMBER] > 0:
+                return 1
+        return idle_steps(self._departures, self._steps, max_skip)
+
+    # SUBSCRIBE TO EVERY VARIABLE NEEDED, SO THAT SUMO SENDS THEM BACK TOGETHER WITH EVERY SIMULATION STEP
+    def _subscribe(self):
+        self._conn.junction.subscribeContext(self._junction, tc.CMD_GET_VEHICLE_VARIABLE, self._topology.subscription_range(self._tl_id), VEHICLE_VARS)
+        for road_id in self._incoming_roads:
+            self._conn.edge.subscribe(road_id, EDGE_VARS)
+        if self._departures is not None:
+            self._conn.simulation.subscribe([tc.VAR_PENDING_VEHICLES])
+
+    # READ THE VEHICLES AROUND THE INTERSECTION FROM THE LAST SUBSCRIPTION RESULTS (no round trip to sumo)
+    # no car is inserted before the first step, and libsumo would still return the results of the previous episode
+    def _update_snapshot(self):
+        if self._steps == 0:
+            self._vehicles = {}
+            return
+        self._vehicles = self._conn.junction.getContextSubscriptionResults(self._junction) or {}
+
+    # RETRIEVE THE CUMULATIVE WAITING TIME OF THE CARS IN THE INCOMING LANES, KEPT UP TO DATE AT EVERY STEP
+    def _get_waiting_times(self):
+        # only the cars currently in incoming roads are considered, the others already crossed the intersection
+        return self._waiting_time.total
+
+    # SET IN SUMO THE CORRECT YELLOW PHASE
+    def _set_yellow_phase(self, old_action):
+        yellow_phase = self._yellow_phases[old_action]  # the phase following the green of the old action
+        if yellow_phase is not None:
+            self._conn.trafficlight.setPhase(self._tl_id, yellow_phase)
+
+    # SET IN SUMO A GREEN PHASE
+    def _set_green_phase(self, action_number):
+        self._conn.trafficlight.setPhase(self._tl_id, self._green_phases[action_number])
+
+    # RETRIEVE THE STATS OF THE SIMULATION FOR ONE SINGLE STEP
+    def _get_stats(self):
+        intersection_queue = 0
+        for road_id in self._incoming_roads:
+            intersection_queue += self._conn.edge.getSubscriptionResults(road_id)[tc.LAST_STEP_VEHICLE_HALTING_NUMBER]
+        return intersection_queue
+
+    # RETRIEVE THE STATE OF THE INTERSECTION FROM SUMO
+    def _get_state(self):
+        vehicles = self._vehicles.values()
+        lane_ids = [values[tc.VAR_LANE_ID] for values in vehicles]
+        lane_positions = [values[tc.VAR_LANEPOSITION] for values in vehicles]
+        return self._state_encoder.presence(lane_ids, lane_positions)
@@ -1,20 +1,100 @@
-import random
+import threading
+
+import numpy as np
+
+# names of the storage arrays, e.g. self._states
+ARRAYS = ["states", "actions", "rewards", "next_states", "dones"]
+
 
 # HANDLES THE MEMORY
+# the samples are stored in preallocated numpy arrays used as a ring buffer:
+# inserting is O(1) and a batch is extracted with a single fancy-indexing operation;
+# a lock makes it safe to add samples from the simulation while a learner thread samples batches
 class Memory:
-    def __init__(self, memory_size):
+    def __init__(self, memory_size, num_states=None):
         self._memory_size = memory_size
-        self._samples = []
+        self._size = 0  # how many samples are stored
+        self._head = 0  # index where the next sample will be written
+        self._rng = np.random.default_rng()
+        self._lock = threading.RLock()
+
+        # storage arrays, allocated once
+        self._states = None
+        self._actions = None
+        self._rewards = None
+        self._next_states = None
+        self._dones = None
 
-    # ADD A SAMPLE INTO THE MEMORY
+        if num_states is not None:
+            self._allocate(num_states)
+
+    # ALLOCATE THE STORAGE ARRAYS FOR THE WHOLE MEMORY
+    def _allocate(self, num_states):
+        self._states = np.zeros((self._memory_size, num_states), dtype=np.float32)
+        self._actions = np.zeros(self._memory_size, dtype=np.int32)
+        self._rewards = np.zeros(self._memory_size, dtype=np.float32)
+        self._next_states = np.zeros((self._memory_size, num_states), dtype=np.float32)
+        self._dones = np.zeros(self._memory_size, dtype=np.float32)
+
+    # ADD A SAMPLE INTO THE MEMORY - (state, action, reward, next_state) or (state, action, reward, next_state, done)
     def add_sample(self, sample):
-        self._samples.append(sample)
-        if len(self._samples) > self._memory_size:
-            self._samples.pop(0)  # if the length is greater than the size of memory, remove the oldest element
-
-    # GET n_samples SAMPLES RANDOMLY FROM THE MEMORY
-    def get_samples(self, n_samples):
-        if n_samples > len(self._samples):
-            return random.sample(self._samples, len(self._samples))  # get all the samples
-        else:
-            return random.sample(self._samples, n_samples)  # get "batch size" number of samples
+        state, action, reward, next_state = sample[:4]
+        done = sample[4] if len(sample) > 4 else False
+        with self._lock:
+            if self._states is None:
+                self._allocate(np.size(state))  # size the memory on the first sample
+
+            self._states[self._head] = state
+            self._actions[self._head] = action
+            self._rewards[self._head] = reward
+            self._next_states[self._head] = next_state
+            self._dones[self._head] = done
+
+            self._head = (self._head + 1) % self._memory_size  # once full, the oldest sample is overwritten
+            self._size = min(self._size + 1, self._memory_size)
+
+    # GET n_samples SAMPLES RANDOMLY, AS (states, actions, rewards, next_states, dones) ARRAYS, WITH THEIR INDEXES
+    # AND IMPORTANCE-SAMPLING WEIGHTS (all 1 for uniform sampling)
+    def sample_batch(self, n_samples):
+        with self._lock:
+            n_samples = min(n_samples, self._size)  # if there are not enough samples, get all of them
+            indexes = self._rng.choice(self._size, n_samples, replace=False)
+            return self._gather(indexes), indexes, np.ones(n_samples, dtype=np.float32)
+
+    # UPDATE THE PRIORITIES OF THE SAMPLES FROM THEIR TD ERRORS - nothing to do for uniform sampling
+    def update_priorities(self, indexes, td_errors):
+        pass
+
+    # EXTRACT THE SAMPLES AT THE GIVEN INDEXES
+    def _gather(self, indexes):
+        return self._states[indexes], self._actions[indexes], self._rewards[indexes], self._next_states[indexes], self._dones[indexes]
+
+    # RETURN A COPY OF THE CONTENT OF THE MEMORY: THE STORED SAMPLES, THE RING BUFFER POSITION AND THE RANDOM GENERATOR STATE
+    def get_state(self):
+        with self._lock:
+            arrays = {}
+            if self._states is not None:
+                arrays = {name: getattr(self, "_" + name)[:self._size].copy() for name in ARRAYS}
+            return {"arrays": arrays, "memory_size": self._memory_size, "size": self._size, "head": self._head, "rng": self._rng.bit_generator.state}
+
+    # LOAD A STATE RETURNED BY get_state - its arrays can be memory-mapped, they are copied
+    def set_state(self, state):
+        if state["memory_size"] != self._memory_size:
+            raise ValueError("the state is of a memory of {} samples, this memory has {}".format(state["memory_size"], self._memory_size))
+        with self._lock:
+            size = state["size"]
+            if size > 0:
+                if self._states is None:
+                    self._allocate(state["arrays"]["states"].shape[1])
+                for name in ARRAYS:
+                    getattr(self, "_" + name)[:size] = state["arrays"][name]
+            self._size = size
+            self._head = state["head"]
+            self._rng.bit_generator.state = state["rng"]
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def memory_size(self):
+        return self._memory_size
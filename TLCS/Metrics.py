@@ -0,0 +1,92 @@
+import bisect
+import threading
+import time
+import timeit
+
+# upper bounds, in seconds, of the buckets of the latency histograms
+LATENCY_BUCKETS = [1e-5, 3e-5, 1e-4, 3e-4, 1e-3, 3e-3, 1e-2, 3e-2, 0.1, 0.3, 1.0, 3.0]
+
+
+# HANDLE THE COUNTERS, GAUGES AND HISTOGRAMS OF A RUN, UPDATED FROM THE SIMULATION AND THE LEARNER THREADS
+# every metric is identified by a name and optional labels, e.g. ("traci_call_seconds", {"call": "simulationStep"});
+# the runners only update them when they are given a Metrics object, so disabled metrics cost nothing
+class Metrics:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self._buckets = list(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, labels) -> value
+        self._gauges = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [count of every bucket + the overflow one, sum, count]
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items())) if labels else ()
+
+    def inc(self, name, value=1, labels=None):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, labels=None):
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, value, labels=None):
+        key = self._key(name, labels)
+        bucket = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(self._buckets) + 1), 0.0, 0]
+            histogram[0][bucket] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    # RETURN A COPY OF EVERY METRIC, TAKEN AT ONE INSTANT
+    def snapshot(self):
+        with self._lock:
+            return {
+                "time": time.time(),
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "histograms": {key: (list(counts), total, count) for key, (counts, total, count) in self._histograms.items()},
+            }
+
+    # WRAP A SUMO CONNECTION SO THAT THE COUNT AND THE LATENCY OF EVERY CALL ARE RECORDED IN traci_call_seconds
+    def instrument(self, conn):
+        return _TimedCalls(conn, self, "")
+
+    @property
+    def buckets(self):
+        return self._buckets
+
+
+# PROXY OF A SUMO CONNECTION OR OF ONE OF ITS DOMAINS (edge, junction, ...), TIMING EVERY FUNCTION CALLED THROUGH IT
+class _TimedCalls:
+    def __init__(self, target, metrics, prefix):
+        self._target = target
+        self._metrics = metrics
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if isinstance(attr, (int, float, str)):  # constants
+            return attr
+        if callable(attr) and not isinstance(attr, type):
+            wrapped = self._timed(attr, {"call": self._prefix + name})
+        else:  # a domain: a traci object, or a class of static functions in libsumo
+            wrapped = _TimedCalls(attr, self._metrics, self._prefix + name + ".")
+        self.__dict__[name] = wrapped  # later lookups do not go through __getattr__
+        return wrapped
+
+    def _timed(self, function, labels):
+        metrics = self._metrics
+
+        def timed(*args, **kwargs):
+            start = timeit.default_timer()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                metrics.observe("traci_call_seconds", timeit.default_timer() - start, labels)
+        return timed
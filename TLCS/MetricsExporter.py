@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import threading
+
+FORMATS = ("prometheus", "jsonl")
+
+
+# WRITE A SNAPSHOT OF THE METRICS TO path EVERY interval SECONDS, FROM A BACKGROUND THREAD
+# "prometheus" -> the file is replaced with the last snapshot in the Prometheus text format (e.g. for the textfile collector)
+# "jsonl"      -> one json line per snapshot is appended to the file
+# the rate of every counter since the previous snapshot is added as a <name>_per_second gauge, e.g. decisions_per_second
+class MetricsExporter:
+    def __init__(self, metrics, path, interval=10, file_format="prometheus"):
+        if file_format not in FORMATS:
+            raise ValueError("unknown metrics format '{}', expected one of {}".format(file_format, FORMATS))
+        self._metrics = metrics
+        self._path = path
+        self._interval = interval
+        self._format = file_format
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._last = None  # previous snapshot, to compute the rates
+
+    # START THE EXPORTING THREAD, IF IT IS NOT ALREADY RUNNING
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="metrics", daemon=True)
+        self._thread.start()
+
+    # STOP THE EXPORTING THREAD, WRITING A LAST SNAPSHOT
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self.export()
+
+    def _loop(self):
+        while not self._stop_event.wait(self._interval):
+            self.export()
+
+    # WRITE ONE SNAPSHOT OF THE METRICS
+    def export(self):
+        snapshot = self._metrics.snapshot()
+        gauges = dict(snapshot["gauges"])
+        if self._last is not None and snapshot["time"] > self._last["time"]:
+            elapsed = snapshot["time"] - self._last["time"]
+            for (name, labels), value in snapshot["counters"].items():
+                rate_name = (name[:-len("_total")] if name.endswith("_total") else name) + "_per_second"
+                gauges[(rate_name, labels)] = (value - self._last["counters"].get((name, labels), 0)) / elapsed
+        self._last = snapshot
+
+        if self._format == "prometheus":
+            self._write_atomic(self._prometheus_text(snapshot["counters"], gauges, snapshot["histograms"]))
+        else:
+            record = {"time": snapshot["time"],
+                      "counters": {self._series(name, labels): value for (name, labels), value in snapshot["counters"].items()},
+                      "gauges": {self._series(name, labels): value for (name, labels), value in gauges.items()},
+                      "histograms": {self._series(name, labels): {"buckets": self._metrics.buckets, "counts": counts, "sum": total, "count": count}
+                                     for (name, labels), (counts, total, count) in snapshot["histograms"].items()}}
+            with open(self._path, "a") as file:
+                file.write(json.dumps(record) + "\n")
+
+    # NAME OF ONE SERIES, WITH ITS LABELS, E.G. traci_call_seconds{call="simulationStep"}
+    @staticmethod
+    def _series(name, labels):
+        if not labels:
+            return name
+        return "{}{{{}}}".format(name, ",".join('{}="{}"'.format(key, value) for key, value in labels))
+
+    def _prometheus_text(self, counters, gauges, histograms):
+        lines = []
+        for kind, values in (("counter", counters), ("gauge", gauges)):
+            for name in sorted(set(name for name, _ in values)):
+                lines.append("# TYPE {} {}".format(name, kind))
+                lines += ["{} {}".format(self._series(name, labels), value) for (series_name, labels), value in sorted(values.items()) if series_name == name]
+        for name in sorted(set(name for name, _ in histograms)):
+            lines.append("# TYPE {} histogram".format(name))
+            for (series_name, labels), (counts, total, count) in sorted(histograms.items()):
+                if series_name != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(self._metrics.buckets + ["+Inf"], counts):  # prometheus buckets are cumulative
+                    cumulative += bucket_count
+                    lines.append("{} {}".format(self._series(name + "_bucket", labels + (("le", bound),)), cumulative))
+                lines.append("{} {}".format(self._series(name + "_sum", labels), total))
+                lines.append("{} {}".format(self._series(name + "_count", labels), count))
+        return "\n".join(lines) + "\n"
+
+    # REPLACE THE FILE IN ONE STEP, SO THAT A READER NEVER SEES A PARTIAL SNAPSHOT
+    def _write_atomic(self, text):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self._path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            file.write(text)
+        os.replace(tmp_path, self._path)
@@ -1,55 +1,170 @@
 import os
 os.environ['TF_CPP_MIN_LOG_LEVEL']='2'  # kill warning about tensorflow
 import tensorflow as tf
+import numpy as np
+
+TARGET_UPDATES = (None, "hard", "soft")
 
 class Model:
-    def __init__(self, num_states, num_actions, batch_size):
+    def __init__(self, num_states, num_actions, batch_size, target_update=None, target_update_steps=1000, tau=0.005, double_dqn=False, separate_actor=False):
         self._num_states = num_states
         self._num_actions = num_actions
         self._batch_size = batch_size
 
+        # target network: None (bootstrap from the online network), "hard" (copy every target_update_steps trainings) or "soft" (Polyak averaging with tau after every training)
+        if target_update not in TARGET_UPDATES:
+            raise ValueError("unknown target_update '{}', expected one of {}".format(target_update, TARGET_UPDATES))
+        if double_dqn and target_update is None:
+            raise ValueError("double_dqn needs a target network")
+        self._target_update = target_update
+        self._target_update_steps = target_update_steps
+        self._tau = tau
+        self._double_dqn = double_dqn
+        self._separate_actor = separate_actor  # actions are chosen by a copy of the weights, refreshed with publish_weights
+        self._train_steps = 0
+
         # define the placeholders
         self._states = None
         self._actions = None
+        self._next_states = None
+        self._rewards = None
+        self._dones = None
+        self._gamma = None
 
         # the output operations
         self._logits = None
-        self._optimizer = None
+        self._greedy_actions = None
+        self._next_values = None
+        self._train_step = None
+        self._step_loss = None
+        self._td_errors = None
+        self._sync_target = None
+        self._publish = None
         self._var_init = None
+        self._variables = None  # every variable of the graph: the networks and the optimizer state
 
         # now setup the model
         self._define_model()
 
+    # DEFINE THE LAYERS OF ONE NETWORK - the online network keeps the default layer names, so old checkpoints still load
+    def _network(self, inputs, scope=None):
+        with tf.variable_scope(scope or tf.get_variable_scope(), reuse=tf.AUTO_REUSE):
+            fc1 = tf.layers.dense(inputs, 400, activation=tf.nn.relu, name="dense")
+            fc2 = tf.layers.dense(fc1, 400, activation=tf.nn.relu, name="dense_1")
+            fc3 = tf.layers.dense(fc2, 400, activation=tf.nn.relu, name="dense_2")
+            fc4 = tf.layers.dense(fc3, 400, activation=tf.nn.relu, name="dense_3")
+            fc5 = tf.layers.dense(fc4, 400, activation=tf.nn.relu, name="dense_4")
+            return tf.layers.dense(fc5, self._num_actions, name="dense_5")
+
     # DEFINE THE STRUCTURE OF THE NEURAL NETWORK
     def _define_model(self):
         # placeholders
         self._states = tf.placeholder(shape=[None, self._num_states], dtype=tf.float32)
-        self._q_s_a = tf.placeholder(shape=[None, self._num_actions], dtype=tf.float32)
+        self._weights = tf.placeholder_with_default(tf.ones([tf.shape(self._states)[0]]), shape=[None])  # importance-sampling weights
+        self._next_states = tf.placeholder(shape=[None, self._num_states], dtype=tf.float32)
+        self._actions = tf.placeholder(shape=[None], dtype=tf.int32)
+        self._rewards = tf.placeholder(shape=[None], dtype=tf.float32)
+        self._dones = tf.placeholder(shape=[None], dtype=tf.float32)
+        self._gamma = tf.placeholder(shape=[], dtype=tf.float32)
+
+        # online network
+        self._logits = self._network(self._states)
+        online_vars = [var for var in tf.trainable_variables() if var.name.startswith("dense")]
+
+        # network used to choose the actions: the online one, or its copy for an actor running beside the learner
+        if self._separate_actor:
+            self._greedy_actions = tf.argmax(self._network(self._states, scope="actor"), axis=1)
+            actor_vars = [var for var in tf.trainable_variables() if var.name.startswith("actor/")]
+            self._publish = tf.group(*[actor.assign(online) for online, actor in zip(online_vars, actor_vars)])
+        else:
+            self._greedy_actions = tf.argmax(self._logits, axis=1)
+
+        # value of the next states used to bootstrap the Q-learning equation
+        next_q_online = self._network(self._next_states)
+        if self._target_update is None:
+            self._next_values = tf.reduce_max(next_q_online, axis=1)
+        else:
+            next_q_target = self._network(self._next_states, scope="target")
+            target_vars = [var for var in tf.trainable_variables() if var.name.startswith("target/")]
+            if self._double_dqn:  # the online network selects the action, the target network evaluates it
+                best_actions = tf.argmax(next_q_online, axis=1, output_type=tf.int32)
+                self._next_values = tf.gather_nd(next_q_target, tf.stack([tf.range(tf.shape(best_actions)[0]), best_actions], axis=1))
+            else:
+                self._next_values = tf.reduce_max(next_q_target, axis=1)
+            self._sync_target = tf.group(*[target.assign(online) for online, target in zip(online_vars, target_vars)])
 
-        # list of nn layers
-        fc1 = tf.layers.dense(self._states, 400, activation=tf.nn.relu)
-        fc2 = tf.layers.dense(fc1, 400, activation=tf.nn.relu)
-        fc3 = tf.layers.dense(fc2, 400, activation=tf.nn.relu)
-        fc4 = tf.layers.dense(fc3, 400, activation=tf.nn.relu)
-        fc5 = tf.layers.dense(fc4, 400, activation=tf.nn.relu)
-        self._logits = tf.layers.dense(fc5, self._num_actions)
+        # targets of the Q-learning equation computed in the graph, no bootstrap from terminal states
+        targets = tf.stop_gradient(self._rewards + self._gamma * self._next_values * (1 - self._dones))
+        q_taken = tf.gather_nd(self._logits, tf.stack([tf.range(tf.shape(self._actions)[0]), self._actions], axis=1))
+        self._td_errors = targets - q_taken
 
         # parameters
-        loss = tf.losses.mean_squared_error(self._q_s_a, self._logits)
-        self._optimizer = tf.train.AdamOptimizer().minimize(loss)
+        optimizer = tf.train.AdamOptimizer()
+        self._step_loss = tf.losses.mean_squared_error(targets, q_taken, weights=self._weights)
+        self._train_step = optimizer.minimize(self._step_loss, var_list=online_vars)
+        if self._target_update == "soft":  # the target weights follow the online ones right after every training step
+            self._train_step = self._with_soft_update(self._train_step, online_vars, target_vars)
+
         self._var_init = tf.global_variables_initializer()
+        self._variables = tf.global_variables()
+        copies = []  # the target and actor networks start as a copy of the online one
+        if self._sync_target is not None:
+            copies += zip(online_vars, target_vars)
+        if self._separate_actor:
+            copies += zip(online_vars, actor_vars)
+        if copies:
+            with tf.control_dependencies([self._var_init]):
+                self._var_init = tf.group(*[copy.assign(online.read_value()) for online, copy in copies])
+
+    # RUN THE POLYAK AVERAGING OF THE TARGET WEIGHTS RIGHT AFTER train_op
+    def _with_soft_update(self, train_op, online_vars, target_vars):
+        with tf.control_dependencies([train_op]):
+            return tf.group(*[target.assign(self._tau * online.read_value() + (1 - self._tau) * target.read_value()) for online, target in zip(online_vars, target_vars)])
+
+    # RETURNS THE BEST ACTION FOR EVERY STATE OF A [n_envs, num_states] BATCH, IN ONE FORWARD PASS
+    def predict_actions(self, states, sess):
+        return sess.run(self._greedy_actions, feed_dict={self._states: states})
+
+    # EPSILON-GREEDY POLICY FOR A BATCH OF STATES - eps can be a single value or one value per state
+    def choose_actions(self, states, eps, sess):
+        n = len(states)
+        explore = np.random.random(n) < np.broadcast_to(eps, (n,))
+        actions = np.random.randint(0, self._num_actions, n)  # random actions
+        if not explore.all():  # the network is not evaluated if every agent explores
+            actions[~explore] = self.predict_actions(states[~explore], sess)  # the best actions given the states
+        return actions
+
+    # COPY THE TRAINED WEIGHTS INTO THE ACTOR NETWORK - nothing to do if the actor uses the online network
+    def publish_weights(self, sess):
+        if self._publish is not None:
+            sess.run(self._publish)
+
+    # COMPUTE THE TARGETS AND TRAIN THE NETWORK ON ONE BATCH OF TRANSITIONS IN A SINGLE CALL, RETURNS (loss, TD errors)
+    def train_step(self, sess, states, actions, rewards, next_states, dones, gamma, weights=None):
+        feed_dict = {self._states: states, self._actions: actions, self._rewards: rewards,
+                     self._next_states: next_states, self._dones: dones, self._gamma: gamma}
+        if weights is not None:
+            feed_dict[self._weights] = weights
+        _, loss, td_errors = sess.run([self._train_step, self._step_loss, self._td_errors], feed_dict=feed_dict)
+        self._after_train_step(sess)
+        return loss, td_errors
 
-    # RETURNS THE OUTPUT OF THE NETWORK GIVEN A SINGLE STATE
-    def predict_one(self, state, sess):
-        return sess.run(self._logits, feed_dict={self._states: state.reshape(1, self.num_states)})
+    # COPY THE ONLINE WEIGHTS INTO THE TARGET NETWORK WHEN IT IS TIME TO
+    def _after_train_step(self, sess):
+        self._train_steps += 1
+        if self._target_update == "hard" and self._train_steps % self._target_update_steps == 0:
+            sess.run(self._sync_target)
 
-    # RETURNS THE OUTPUT OF THE NETWORK GIVEN A BATCH OF STATES
-    def predict_batch(self, states, sess):
-        return sess.run(self._logits, feed_dict={self._states: states})
+    # RETURN A COPY OF THE STATE OF THE MODEL: THE VALUE OF EVERY VARIABLE AND THE NUMBER OF TRAINING STEPS
+    def get_state(self, sess):
+        values = sess.run(self._variables)
+        return {"variables": {variable.name: value for variable, value in zip(self._variables, values)}, "train_steps": self._train_steps}
 
-    # TRAIN THE NETWORK
-    def train_batch(self, sess, x_batch, y_batch):
-        sess.run(self._optimizer, feed_dict={self._states: x_batch, self._q_s_a: y_batch})
+    # LOAD A STATE RETURNED BY get_state
+    def set_state(self, sess, state):
+        for variable in self._variables:
+            variable.load(state["variables"][variable.name], sess)
+        self._train_steps = state["train_steps"]
 
     @property
     def num_states(self):
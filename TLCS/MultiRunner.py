@@ -0,0 +1,138 @@
+import timeit
+
+import numpy as np
+import traci.constants as tc
+
+from IntersectionSim import VEHICLE_VARS, EDGE_VARS
+from SimRunner import SimRunner
+from StateEncoder import StateEncoder
+
+
+# HANDLE THE SIMULATION OF A NETWORK WITH SEVERAL TRAFFIC LIGHTS, CONTROLLED BY ONE SHARED AGENT
+# the traffic lights, their incoming edges and their phases come from the topology of the net file (see NetTopology);
+# every light has its own observation and reward, the actions of all of them are chosen with a single batched forward pass
+# and every light adds its own transitions to the shared memory, and its own records to the decision log; all the lights decide at the same steps
+class MultiRunner(SimRunner):
+    def __init__(self, sess, model, memory, topology, total_episodes, gamma, max_steps, green_duration, yellow_duration, sumoCmd, replay_scheduler=None, prefetch_batches=0, fast_forward=False, backend=None, metrics=None, decision_logger=None):
+        if fast_forward:  # the jumps need the departures of the generated routes, the network runs the routes of its sumo configuration
+            raise ValueError("fast forward is not available for a network, set it to False")
+        super().__init__(sess, model, memory, None, total_episodes, gamma, max_steps, green_duration, yellow_duration, sumoCmd, replay_scheduler=replay_scheduler, prefetch_batches=prefetch_batches, backend=backend, metrics=metrics, decision_logger=decision_logger, topology=topology)
+        traffic_lights = []
+        for tl_id in topology.traffic_lights:
+            light = {"id": tl_id, "junction": topology.junction(tl_id), "incoming_edges": topology.incoming_edges(tl_id), "range": topology.subscription_range(tl_id),
+                     "encoder": StateEncoder(topology, tl_id), "green_phases": topology.green_phases(tl_id), "yellow_phases": topology.yellow_phases(tl_id)}
+            if light["encoder"].num_states != model.num_states or len(light["green_phases"]) != model.num_actions:
+                raise ValueError("traffic light '{}' has {} states and {} actions, the model {} and {}".format(
+                    tl_id, light["encoder"].num_states, len(light["green_phases"]), model.num_states, model.num_actions))
+            traffic_lights.append(light)
+        self._traffic_lights = traffic_lights
+        self._incoming_edges = [edge_id for light in traffic_lights for edge_id in light["incoming_edges"]]
+        self._junction_vehicles = []  # snapshot of the vehicles around every light
+
+    # SIMULATE ONE EPISODE OF THE NETWORK, THE EPISODE NUMBER IS THE SEED OF SUMO
+    def run(self, episode, seed=None):
+        start_time = timeit.default_timer()
+        self._start_training()
+        self._start_sumo(self._sumoCmd + ["--seed", str(episode if seed is None else seed)])
+
+        # set the epsilon for this episode
+        self._eps = 1.0 - (episode / self._total_episodes)
+
+        # inits
+        n_lights = len(self._traffic_lights)
+        tot_neg_reward = 0
+        old_total_wait = np.zeros(n_lights)
+        self._train_time = 0
+        self._replay_scheduler.reset()
+
+        while self._steps < self._max_steps:
+
+            # state and waiting time of every light, reward of the previous actions
+            self._check_learner()
+            self._update_snapshot()
+            current_states = self._get_states()
+            current_total_wait = self._get_waiting_times()
+            rewards = old_total_wait - current_total_wait
+
+            if self._steps != 0:
+                for light in range(n_lights):
+                    self._memory.add_sample((old_states[light], old_actions[light], rewards[light], current_states[light]))
+                tot_neg_reward += rewards[rewards < 0].sum()
+                if self._decision_logger is not None:  # the previous decision of every light, with the reward it got
+                    queues = self._get_light_queues()
+                    for light in range(n_lights):
+                        self._decision_logger.log(episode, decision_step, old_actions[light], rewards[light], queues[light], current_total_wait[light], self._eps, light)
+
+            # the phases of all the lights, in one forward pass
+            actions = self._model.choose_actions(current_states, self._eps, self._sess)
+            decision_step = self._steps  # logged at the next decision, with the rewards of the actions
+            if self._metrics is not None:
+                self._record_decision(n_lights)
+            self._train(n_lights * self._replay_scheduler.on_decision())
+
+            # the lights that change phase show their yellow first, the others keep their green meanwhile
+            if self._steps != 0:
+                changed = [light for light in range(n_lights) if actions[light] != old_actions[light] and self._traffic_lights[light]["yellow_phases"][old_actions[light]] is not None]
+                for light in changed:
+                    self._conn.trafficlight.setPhase(self._traffic_lights[light]["id"], self._traffic_lights[light]["yellow_phases"][old_actions[light]])
+                if changed:
+                    self._simulate(self._yellow_duration)
+
+            for light, action in zip(self._traffic_lights, actions):
+                self._conn.trafficlight.setPhase(light["id"], light["green_phases"][action])
+            self._simulate(self._green_duration)
+
+            old_states = current_states
+            old_actions = actions
+            old_total_wait = current_total_wait
+
+        self._save_stats(float(tot_neg_reward))
+        if self._decision_logger is not None:
+            self._decision_logger.flush()
+        print("Total reward: {}, Eps: {}".format(tot_neg_reward, self._eps))
+        self._close_sumo()
+
+        self._train(self._replay_scheduler.on_episode_end(len(self._memory), self._model.batch_size))
+        self._save_times(timeit.default_timer() - start_time)
+        return 1
+
+    # SUBSCRIBE TO THE VEHICLES AROUND EVERY LIGHT AND TO THE HALTING CARS OF EVERY INCOMING EDGE
+    def _subscribe(self):
+        for light in self._traffic_lights:
+            self._conn.junction.subscribeContext(light["junction"], tc.CMD_GET_VEHICLE_VARIABLE, light["range"], VEHICLE_VARS)
+        for edge_id in self._incoming_edges:
+            self._conn.edge.subscribe(edge_id, EDGE_VARS)
+
+    # READ THE VEHICLES AROUND EVERY LIGHT FROM THE LAST SUBSCRIPTION RESULTS - nothing before the first step, see IntersectionSim
+    def _update_snapshot(self):
+        if self._steps == 0:
+            self._junction_vehicles = [{} for _ in self._traffic_lights]
+        else:
+            self._junction_vehicles = [self._conn.junction.getContextSubscriptionResults(light["junction"]) or {} for light in self._traffic_lights]
+        self._vehicles = {veh_id: values for vehicles in self._junction_vehicles for veh_id, values in vehicles.items()}
+
+    # STATE OF EVERY LIGHT, AS A [n_lights, num_states] BATCH
+    def _get_states(self):
+        states = np.empty((len(self._traffic_lights), self._model.num_states))
+        for index, (light, vehicles) in enumerate(zip(self._traffic_lights, self._junction_vehicles)):
+            values = vehicles.values()
+            states[index] = light["encoder"].presence([v[tc.VAR_LANE_ID] for v in values], [v[tc.VAR_LANEPOSITION] for v in values])
+        return states
+
+    # NO RUNNING TOTAL: THE WAITING TIMES ARE SUMMED FROM THE SNAPSHOT OF EVERY LIGHT, AT EVERY DECISION
+    # the trips of a network can end on an incoming edge, and the waiting time of a car that left the simulation cannot be read
+    def _update_waiting_time(self):
+        pass
+
+    # CUMULATIVE WAITING TIME OF THE CARS IN THE INCOMING EDGES OF EVERY LIGHT
+    def _get_waiting_times(self):
+        return np.array([sum(v[tc.VAR_ACCUMULATED_WAITING_TIME] for v in vehicles.values() if v[tc.VAR_ROAD_ID] in light["incoming_edges"])
+                         for light, vehicles in zip(self._traffic_lights, self._junction_vehicles)])
+
+    # HALTING CARS IN THE INCOMING EDGES OF EVERY LIGHT, FOR ONE STEP
+    def _get_light_queues(self):
+        return [sum(self._conn.edge.getSubscriptionResults(edge_id)[tc.LAST_STEP_VEHICLE_HALTING_NUMBER] for edge_id in light["incoming_edges"]) for light in self._traffic_lights]
+
+    # HALTING CARS IN THE INCOMING EDGES OF ALL THE LIGHTS, FOR ONE STEP
+    def _get_stats(self):
+        return sum(self._conn.edge.getSubscriptionResults(edge_id)[tc.LAST_STEP_VEHICLE_HALTING_NUMBER] for edge_id in self._incoming_edges)
@@ -0,0 +1,182 @@
+import hashlib
+import math
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+# net file of the single intersection
+NET_FILE = "intersection/tlcs.net.xml"
+
+# bump when the compiled index changes, so that old caches are not reused
+TOPOLOGY_VERSION = 1
+
+# meters added to the distance between a traffic light and the farthest start of its incoming edges, for the subscriptions
+RANGE_MARGIN = 10
+
+
+# GROUP THE LANES OF ONE EDGE: the left-most lane ("turn left only") has its own group, the others share one
+def left_lane_grouping(lane_ids):
+    return [[lane_id for lane_id in lane_ids[:-1]], [lane_ids[-1]]]
+
+
+# HANDLE THE TOPOLOGY OF A NET FILE, SEEN FROM ITS TRAFFIC LIGHTS: controlled junction, incoming edges and lanes,
+# lane groups and lengths, phase program and the green and yellow phase of every action.
+# the net file is parsed once into a compact index of numpy arrays, stored in cache_dir in a file named after
+# the hash of the net file; later loads of the same file only read that index
+class NetTopology:
+    def __init__(self, index, net_file=None):
+        self._net_file = net_file
+        self._lights = {}
+        tl_ids = [str(tl_id) for tl_id in index["tl_ids"]]
+        for tl, tl_id in enumerate(tl_ids):
+            lanes = index["lane_tl"] == tl
+            phases = index["phase_tl"] == tl
+            actions = index["action_tl"] == tl
+            edges = index["edge_tl"] == tl
+            edge_ids = [str(edge_id) for edge_id in index["edge_ids"]]
+            self._lights[tl_id] = {
+                "junction": str(index["tl_junction"][tl]),
+                "range": float(index["tl_range"][tl]),
+                "incoming_edges": [edge_ids[edge] for edge in np.flatnonzero(edges)],
+                "lane_ids": [str(lane_id) for lane_id in index["lane_ids"][lanes]],
+                "lane_edges": [edge_ids[edge] for edge in index["lane_edge"][lanes]],
+                "lane_groups": index["lane_group"][lanes],
+                "lane_lengths": index["lane_length"][lanes],
+                "program": list(zip((str(state) for state in index["phase_state"][phases]), index["phase_duration"][phases].tolist())),
+                "green_phases": index["action_green"][actions].tolist(),
+                "yellow_phases": [None if phase < 0 else phase for phase in index["action_yellow"][actions].tolist()],
+            }
+        self._tl_ids = tl_ids
+
+    # RETURN THE TOPOLOGY OF net_file, FROM THE CACHE IF IT WAS ALREADY COMPILED
+    @classmethod
+    def load(cls, net_file=NET_FILE, cache_dir="intersection/topology_cache"):
+        with open(net_file, "rb") as file:
+            digest = hashlib.sha1(str(TOPOLOGY_VERSION).encode() + file.read()).hexdigest()[:16]
+        if cache_dir is None:
+            return cls(cls.compile(net_file), net_file)
+
+        path = os.path.join(cache_dir, "{}_{}.npz".format(os.path.basename(net_file).split(".")[0], digest))
+        if os.path.exists(path):
+            with np.load(path) as index:
+                return cls(dict(index), net_file)
+
+        index = cls.compile(net_file)
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")  # written atomically, see RouteCache
+        with os.fdopen(fd, "wb") as file:
+            np.savez(file, **index)
+        os.replace(tmp_path, path)
+        return cls(index, net_file)
+
+    # PARSE THE NET FILE INTO THE INDEX: ONE ARRAY PER FIELD, THE ROWS OF EVERY TRAFFIC LIGHT POINT TO IT BY POSITION
+    @staticmethod
+    def compile(net_file, grouping=left_lane_grouping):
+        root = ET.parse(net_file).getroot()
+        positions = {node.get("id"): (float(node.get("x")), float(node.get("y"))) for node in root.iter("junction")}
+        edges = {edge.get("id"): edge for edge in root.iter("edge") if edge.get("function") != "internal"}
+
+        links = {}  # traffic light id -> incoming edges, in the order of their first link
+        for connection in sorted((c for c in root.iter("connection") if c.get("tl") is not None), key=lambda c: int(c.get("linkIndex"))):
+            edge_ids = links.setdefault(connection.get("tl"), [])
+            if connection.get("from") in edges and connection.get("from") not in edge_ids:
+                edge_ids.append(connection.get("from"))
+
+        index = {name: [] for name in ["tl_ids", "tl_junction", "tl_range", "edge_ids", "edge_tl", "lane_ids", "lane_tl", "lane_edge", "lane_group",
+                                       "lane_length", "phase_tl", "phase_state", "phase_duration", "action_tl", "action_green", "action_yellow"]}
+        for tl_logic in root.iter("tlLogic"):
+            tl_id = tl_logic.get("id")
+            if tl_id in index["tl_ids"]:  # only the first program of a traffic light
+                continue
+            if not links.get(tl_id):
+                raise ValueError("traffic light '{}' of {} controls no incoming lane".format(tl_id, net_file))
+            tl = len(index["tl_ids"])
+            junction = edges[links[tl_id][0]].get("to")
+            x, y = positions[junction]
+
+            # the incoming edges clockwise, starting from the west one (W, N, E, S for a 4 arms intersection)
+            def clockwise_from_west(edge_id):
+                from_x, from_y = positions[edges[edge_id].get("from")]
+                return (180 - math.degrees(math.atan2(from_y - y, from_x - x))) % 360
+            incoming_edges = sorted(links[tl_id], key=clockwise_from_west)
+            distances = [math.hypot(positions[edges[edge_id].get("from")][0] - x, positions[edges[edge_id].get("from")][1] - y) for edge_id in incoming_edges]
+
+            index["tl_ids"].append(tl_id)
+            index["tl_junction"].append(junction)
+            index["tl_range"].append(max(distances) + RANGE_MARGIN)
+
+            group = 0
+            for edge_id in incoming_edges:
+                edge = len(index["edge_ids"])
+                index["edge_ids"].append(edge_id)
+                index["edge_tl"].append(tl)
+                lanes = sorted(edges[edge_id].iter("lane"), key=lambda lane: int(lane.get("index")))
+                lengths = {lane.get("id"): float(lane.get("length")) for lane in lanes}
+                for lane_group in grouping([lane.get("id") for lane in lanes]):
+                    for lane_id in lane_group:
+                        index["lane_ids"].append(lane_id)
+                        index["lane_tl"].append(tl)
+                        index["lane_edge"].append(edge)
+                        index["lane_group"].append(group)
+                        index["lane_length"].append(lengths[lane_id])
+                    group += 1
+
+            # every green phase is an action, the next phase is its yellow if it has any yellow light
+            states = [phase.get("state") for phase in tl_logic.iter("phase")]
+            for state, phase in zip(states, tl_logic.iter("phase")):
+                index["phase_tl"].append(tl)
+                index["phase_state"].append(state)
+                index["phase_duration"].append(float(phase.get("duration")))
+            for phase, state in enumerate(states):
+                if "y" not in state.lower() and "g" in state.lower():
+                    following = (phase + 1) % len(states)
+                    index["action_tl"].append(tl)
+                    index["action_green"].append(phase)
+                    index["action_yellow"].append(following if "y" in states[following].lower() else -1)
+
+        if not index["tl_ids"]:
+            raise ValueError("no traffic light in {}".format(net_file))
+        floats = ["tl_range", "lane_length", "phase_duration"]
+        strings = ["tl_ids", "tl_junction", "edge_ids", "lane_ids", "phase_state"]
+        return {name: np.asarray(values, dtype=np.float64 if name in floats else str if name in strings else np.int32) for name, values in index.items()}
+
+    @property
+    def net_file(self):
+        return self._net_file
+
+    @property
+    def traffic_lights(self):
+        return self._tl_ids
+
+    # THE JUNCTION CONTROLLED BY A TRAFFIC LIGHT, THE CENTER OF ITS CONTEXT SUBSCRIPTION
+    def junction(self, tl_id):
+        return self._lights[tl_id]["junction"]
+
+    # METERS AROUND THE JUNCTION THAT COVER EVERY INCOMING LANE
+    def subscription_range(self, tl_id):
+        return self._lights[tl_id]["range"]
+
+    def incoming_edges(self, tl_id):
+        return self._lights[tl_id]["incoming_edges"]
+
+    # THE INCOMING LANES, THEIR EDGE, GROUP (POSITION IN THE STATE) AND LENGTH
+    def lanes(self, tl_id):
+        light = self._lights[tl_id]
+        return light["lane_ids"], light["lane_edges"], light["lane_groups"], light["lane_lengths"]
+
+    # LIST OF (state, duration) OF EVERY PHASE
+    def program(self, tl_id):
+        return self._lights[tl_id]["program"]
+
+    # PHASE INDEX OF THE GREEN OF EVERY ACTION
+    def green_phases(self, tl_id):
+        return self._lights[tl_id]["green_phases"]
+
+    # PHASE INDEX OF THE YELLOW SHOWN WHEN LEAVING EVERY ACTION, None IF THE GREEN IS NOT FOLLOWED BY A YELLOW
+    def yellow_phases(self, tl_id):
+        return self._lights[tl_id]["yellow_phases"]
+
+    def num_actions(self, tl_id):
+        return len(self._lights[tl_id]["green_phases"])
@@ -0,0 +1,68 @@
+import timeit
+
+import numpy as np
+
+from SimRunner import SimRunner
+from VecEnv import VecEnv
+
+
+# HANDLE THE SIMULATION OF n_workers EPISODES IN PARALLEL, ONE SUMO INSTANCE PER PROCESS (see VecEnv)
+# the workers simulate while the learner trains; their transitions go into the shared memory
+class ParallelRunner(SimRunner):
+    def __init__(self, sess, model, memory, n_workers, total_episodes, gamma, max_steps, green_duration, yellow_duration, sumoCmd, replay_scheduler=None, route_cache=None, prefetch_batches=0, fast_forward=False, backend=None, metrics=None, decision_logger=None, topology=None):
+        super().__init__(sess, model, memory, None, total_episodes, gamma, max_steps, green_duration, yellow_duration, sumoCmd, replay_scheduler=replay_scheduler, prefetch_batches=prefetch_batches, fast_forward=fast_forward, backend=backend, metrics=metrics, decision_logger=decision_logger, topology=topology)
+        self._n_workers = n_workers
+        self._envs = VecEnv(n_workers, sumoCmd, max_steps, green_duration, yellow_duration, self._topology, route_cache, fast_forward, self._backend.name)
+
+    # RUN THE EPISODES first_episode ... first_episode + n_workers - 1, ONE PER WORKER, RETURN HOW MANY WERE RUN
+    def run(self, first_episode):
+        start_time = timeit.default_timer()
+        episodes = list(range(first_episode, min(first_episode + self._n_workers, self._total_episodes)))
+        eps = np.array([1.0 - (episode / self._total_episodes) for episode in episodes])  # epsilon of every episode
+        tot_neg_reward = np.zeros(len(episodes))
+        steps = np.zeros(len(episodes), dtype=int)  # simulation step of every episode
+        self._train_time = 0
+        self._replay_scheduler.reset()
+
+        self._start_training()
+        states = self._envs.reset(episodes, range(len(episodes)))  # the episode number is the seed of the route generation
+
+        active = list(range(len(episodes)))
+        pending_batches = 0  # batches scheduled by the simulation steps of the last round
+        while active:
+            self._check_learner()
+            actions = self._model.choose_actions(states[active], eps[active], self._sess)  # one forward pass for all the workers
+            self._envs.step_async(actions, active)
+            if self._metrics is not None:  # the traci calls of the workers are not recorded, they happen in other processes
+                self._eps = float(eps[active].mean())
+                self._record_decision(len(active))
+
+            # train while the workers are simulating
+            self._train(pending_batches + len(active) * self._replay_scheduler.on_decision())
+            pending_batches = 0
+
+            next_states, rewards, dones, infos = self._envs.step_wait()
+            for k, i in enumerate(active):
+                self._memory.add_sample((states[i], actions[k], rewards[k], next_states[k]))
+                if self._decision_logger is not None:
+                    self._decision_logger.log(episodes[i], steps[i], actions[k], rewards[k], infos["queue"][k], infos["waiting_time"][k], eps[i])
+                pending_batches += sum(self._replay_scheduler.on_sim_step() for _ in range(infos["steps"][k]))
+            steps[active] += infos["steps"]
+            states[active] = next_states
+            tot_neg_reward[active] += np.minimum(rewards, 0)
+            active = [i for i, done in zip(active, dones) if not done]
+
+        for i, queue in enumerate(self._envs.sum_intersection_queues(range(len(episodes)))):
+            self._sum_intersection_queue = queue
+            self._save_stats(float(tot_neg_reward[i]))
+            print("Episode {} - Total reward: {}, Eps: {}".format(episodes[i] + 1, tot_neg_reward[i], eps[i]))
+        if self._decision_logger is not None:
+            self._decision_logger.flush()
+
+        self._train(pending_batches + self._replay_scheduler.on_episode_end(len(self._memory), self._model.batch_size))
+        self._save_times(timeit.default_timer() - start_time)
+        return len(episodes)
+
+    # STOP THE WORKERS AND THEIR SUMO INSTANCES
+    def close(self):
+        self._envs.close()
@@ -0,0 +1,102 @@
+import numpy as np
+
+from Memory import Memory
+
+
+# BINARY TREE WHERE EVERY NODE IS THE SUM OF ITS CHILDREN, STORED IN A FLAT ARRAY
+# node 1 is the root, the children of node i are 2i and 2i+1, the leaves start at index capacity
+class SumTree:
+    def __init__(self, size):
+        self._capacity = 1
+        while self._capacity < size:
+            self._capacity *= 2
+        self._depth = self._capacity.bit_length() - 1
+        self._tree = np.zeros(2 * self._capacity, dtype=np.float64)
+
+    # SET THE VALUES OF THE LEAVES AT indexes AND RECOMPUTE THEIR ANCESTORS, LEVEL BY LEVEL
+    def update(self, indexes, values):
+        nodes = np.asarray(indexes) + self._capacity
+        self._tree[nodes] = values
+        for _ in range(self._depth):
+            nodes = np.unique(nodes // 2)
+            self._tree[nodes] = self._tree[2 * nodes] + self._tree[2 * nodes + 1]
+
+    # FIND THE LEAF OF EVERY VALUE IN [0, total), DESCENDING ALL THE VALUES TOGETHER
+    def find(self, values):
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self._depth):
+            left = self._tree[2 * nodes]
+            go_right = values >= left
+            values -= left * go_right
+            nodes = 2 * nodes + go_right
+        return nodes - self._capacity
+
+    def values(self, indexes):
+        return self._tree[np.asarray(indexes) + self._capacity]
+
+    @property
+    def total(self):
+        return self._tree[1]
+
+
+# HANDLES THE MEMORY WITH PRIORITIZED EXPERIENCE REPLAY
+# samples are drawn with probability priority^alpha, where the priority is the last TD error of the sample;
+# the bias is corrected with importance-sampling weights, with beta annealed towards 1
+class PrioritizedMemory(Memory):
+    def __init__(self, memory_size, num_states=None, alpha=0.6, beta=0.4, beta_increment=1e-5, epsilon=1e-3):
+        super().__init__(memory_size, num_states)
+        self._tree = SumTree(memory_size)
+        self._alpha = alpha
+        self._beta = beta
+        self._beta_increment = beta_increment
+        self._epsilon = epsilon  # minimum priority, so that every sample can be drawn
+        self._max_priority = 1.0
+
+    # ADD A SAMPLE INTO THE MEMORY, WITH THE HIGHEST PRIORITY SO THAT IT IS REPLAYED AT LEAST ONCE
+    def add_sample(self, sample):
+        with self._lock:
+            index = self._head
+            super().add_sample(sample)
+            self._tree.update([index], self._max_priority ** self._alpha)
+
+    # GET n_samples SAMPLES, ONE FROM EVERY SEGMENT OF THE TOTAL PRIORITY, WITH THEIR INDEXES AND WEIGHTS
+    def sample_batch(self, n_samples):
+        with self._lock:
+            n_samples = min(n_samples, self._size)
+            segment = self._tree.total / n_samples
+            values = (np.arange(n_samples) + self._rng.random(n_samples)) * segment
+            indexes = np.minimum(self._tree.find(values), self._size - 1)  # guard against rounding at the last segment
+
+            # importance-sampling weights, normalized by the largest one
+            probabilities = self._tree.values(indexes) / self._tree.total
+            weights = (self._size * probabilities) ** -self._beta
+            weights /= weights.max()
+            self._beta = min(1.0, self._beta + self._beta_increment)
+
+            return self._gather(indexes), indexes, weights.astype(np.float32)
+
+    # SET THE PRIORITIES OF THE REPLAYED SAMPLES FROM THEIR TD ERRORS
+    def update_priorities(self, indexes, td_errors):
+        priorities = np.abs(td_errors) + self._epsilon
+        with self._lock:
+            self._max_priority = max(self._max_priority, priorities.max())
+            self._tree.update(indexes, priorities ** self._alpha)
+
+    # THE STATE OF THE MEMORY, SEE Memory.get_state, WITH THE PRIORITIES OF THE SAMPLES AND THE SAMPLING PARAMETERS
+    def get_state(self):
+        with self._lock:
+            state = super().get_state()
+            if self._size > 0:
+                state["arrays"]["priorities"] = self._tree.values(np.arange(self._size))
+            state["beta"] = self._beta
+            state["max_priority"] = float(self._max_priority)
+            return state
+
+    def set_state(self, state):
+        with self._lock:
+            super().set_state(state)
+            if state["size"] > 0:
+                self._tree.update(np.arange(state["size"]), state["arrays"]["priorities"])
+            self._beta = state["beta"]
+            self._max_priority = state["max_priority"]
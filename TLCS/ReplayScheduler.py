@@ -0,0 +1,54 @@
+# HANDLE WHEN THE AGENT IS TRAINED DURING AN EPISODE
+# modes:
+#   "step"     -> train 1 batch every every_n_steps simulation steps (every_n_steps=1 is the original behaviour)
+#   "decision" -> train batches_per_decision batches every time the agent chooses an action
+#   "episode"  -> train only at the end of the episode, for a number of epochs over the memory
+#   "async"    -> train continuously in a background learner thread, publishing the weights to the actor every publish_interval batches
+class ReplayScheduler:
+    MODES = ("step", "decision", "episode", "async")
+
+    def __init__(self, mode="step", every_n_steps=1, batches_per_decision=1, epochs=1, publish_interval=100):
+        if mode not in self.MODES:
+            raise ValueError("unknown replay mode '{}', expected one of {}".format(mode, self.MODES))
+        if every_n_steps < 1:
+            raise ValueError("every_n_steps must be at least 1")
+        self._mode = mode
+        self._every_n_steps = every_n_steps
+        self._batches_per_decision = batches_per_decision
+        self._epochs = epochs
+        self._publish_interval = publish_interval
+        self._step_counter = 0
+
+    # RESET THE COUNTERS AT THE BEGINNING OF AN EPISODE
+    def reset(self):
+        self._step_counter = 0
+
+    # NUMBER OF BATCHES TO TRAIN AFTER ONE SIMULATION STEP
+    def on_sim_step(self):
+        if self._mode != "step":
+            return 0
+        self._step_counter += 1
+        if self._step_counter % self._every_n_steps == 0:
+            return 1
+        return 0
+
+    # NUMBER OF BATCHES TO TRAIN AFTER ONE DECISION OF THE AGENT
+    def on_decision(self):
+        if self._mode != "decision":
+            return 0
+        return self._batches_per_decision
+
+    # NUMBER OF BATCHES TO TRAIN AT THE END OF THE EPISODE - one epoch covers the whole memory once
+    def on_episode_end(self, memory_len, batch_size):
+        if self._mode != "episode":
+            return 0
+        batches_per_epoch = -(-memory_len // batch_size)  # ceil division
+        return self._epochs * batches_per_epoch
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def publish_interval(self):
+        return self._publish_interval
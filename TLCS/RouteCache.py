@@ -0,0 +1,63 @@
+import hashlib
+import os
+import tempfile
+
+# bump when the route generation changes, so that old files are not reused
+GENERATOR_VERSION = 1
+
+
+# HANDLE A DIRECTORY OF GENERATED ROUTE FILES, ONE FILE PER (seed, demand parameters)
+# files are written atomically, so concurrent workers never read a partial file,
+# and the least recently used ones are deleted when the directory grows over max_bytes
+class RouteCache:
+    def __init__(self, cache_dir="intersection/route_cache", max_bytes=200 * 1024 * 1024):
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # RETURN THE PATH OF THE ROUTE FILE OF key, GENERATING IT WITH write_file(path) IF NOT CACHED
+    def get(self, key, write_file):
+        path = os.path.join(self._cache_dir, self._file_name(key))
+        if os.path.exists(path):
+            os.utime(path)  # mark as recently used
+            return path
+
+        fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            write_file(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._evict(keep=path)
+        return path
+
+    # NAME OF THE FILE OF ONE KEY, HASH OF THE GENERATOR VERSION AND THE DEMAND PARAMETERS
+    @staticmethod
+    def _file_name(key):
+        digest = hashlib.sha1(repr((GENERATOR_VERSION,) + tuple(key)).encode()).hexdigest()[:16]
+        return "routes_{}.rou.xml".format(digest)
+
+    # DELETE THE LEAST RECENTLY USED FILES UNTIL THE CACHE FITS IN max_bytes
+    def _evict(self, keep):
+        files = []
+        for entry in os.scandir(self._cache_dir):
+            if entry.is_file() and entry.name.endswith(".rou.xml"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self._max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # already evicted by another worker
+                pass
+            total -= size
+
+    @property
+    def cache_dir(self):
+        return self._cache_dir
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from RouteCache import GENERATOR_VERSION
+from TrafficGenerator import TrafficGenerator, ROUTE_IDS, DEMAND_DTYPE
+
+SCENARIO_TYPES = ("synthetic", "recorded")
+REQUIRED_KEYS = {
+    "synthetic": ("seed", "n_cars", "max_steps", "straight_ratio"),  # generated by TrafficGenerator
+    "recorded": ("max_steps", "depart", "route"),  # one departure step and one route id per vehicle
+}
+
+
+# HANDLE THE NAMED DEMAND SCENARIOS USED FOR EVALUATION
+# every scenario is a small json file "<name>_v<version>.json" in scenario_dir;
+# it is validated when loaded and its route file is written only once in route_dir, in a file named after the hash
+# of the scenario and of the generator version (see RouteCache), so that a changed scenario or generator gets a new file
+class ScenarioRegistry:
+    def __init__(self, scenario_dir="scenarios", route_dir="intersection/scenarios"):
+        self._scenario_dir = scenario_dir
+        self._route_dir = route_dir
+        self._scenarios = {}  # (name, version) -> scenario
+        for file_name in sorted(os.listdir(scenario_dir)):
+            if file_name.endswith(".json"):
+                scenario = self._validate(self._read(os.path.join(scenario_dir, file_name)), file_name)
+                self._scenarios[(scenario["name"], scenario["version"])] = scenario
+
+    @staticmethod
+    def _read(path):
+        with open(path) as file:
+            return json.load(file)
+
+    # CHECK THAT THE SCENARIO IS COMPLETE AND CONSISTENT
+    @staticmethod
+    def _validate(scenario, file_name):
+        for key in ("name", "version", "type"):
+            if key not in scenario:
+                raise ValueError("{}: missing '{}'".format(file_name, key))
+        if scenario["type"] not in SCENARIO_TYPES:
+            raise ValueError("{}: unknown type '{}', expected one of {}".format(file_name, scenario["type"], SCENARIO_TYPES))
+        for key in REQUIRED_KEYS[scenario["type"]]:
+            if key not in scenario:
+                raise ValueError("{}: missing '{}' for a {} scenario".format(file_name, key, scenario["type"]))
+
+        if scenario["type"] == "recorded":
+            depart = np.asarray(scenario["depart"], dtype=np.float64)
+            if len(depart) != len(scenario["route"]):
+                raise ValueError("{}: 'depart' and 'route' have different lengths".format(file_name))
+            if np.any(np.diff(depart) < 0) or np.any(depart < 0) or np.any(depart > scenario["max_steps"]):
+                raise ValueError("{}: departures must be sorted and within 0:max_steps".format(file_name))
+            unknown = set(scenario["route"]) - set(ROUTE_IDS.tolist())
+            if unknown:
+                raise ValueError("{}: unknown routes {}".format(file_name, sorted(unknown)))
+        return scenario
+
+    # RETURN A SCENARIO, THE LATEST VERSION IF version IS NOT GIVEN
+    def get(self, name, version=None):
+        if version is None:
+            versions = [v for n, v in self._scenarios if n == name]
+            if not versions:
+                raise KeyError("unknown scenario '{}', available: {}".format(name, self.names()))
+            version = max(versions)
+        if (name, version) not in self._scenarios:
+            raise KeyError("unknown scenario '{}' version {}".format(name, version))
+        return self._scenarios[(name, version)]
+
+    # DEMAND OF A SCENARIO AS A STRUCTURED ARRAY OF DEMAND_DTYPE
+    def demand(self, name, version=None):
+        scenario = self.get(name, version)
+        if scenario["type"] == "synthetic":
+            traffic_gen = TrafficGenerator(scenario["max_steps"], n_cars_generated=scenario["n_cars"], straight_ratio=scenario["straight_ratio"])
+            return traffic_gen.generate_demand(scenario["seed"])
+        route_index = {route_id: index for index, route_id in enumerate(ROUTE_IDS.tolist())}
+        demand = np.empty(len(scenario["depart"]), dtype=DEMAND_DTYPE)
+        demand["depart"] = scenario["depart"]
+        demand["route"] = [route_index[route_id] for route_id in scenario["route"]]
+        return demand
+
+    # PATH OF THE ROUTE FILE OF A SCENARIO, TO GIVE TO SUMO
+    def route_file(self, name, version=None):
+        scenario = self.get(name, version)
+        prefix = "{}_v{}_".format(scenario["name"], scenario["version"])
+        digest = hashlib.sha1(repr((GENERATOR_VERSION, json.dumps(scenario, sort_keys=True))).encode()).hexdigest()[:16]
+        path = os.path.join(self._route_dir, prefix + digest + ".rou.xml")
+        if os.path.exists(path):
+            return path
+
+        os.makedirs(self._route_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._route_dir, suffix=".tmp")  # written atomically, see RouteCache
+        os.close(fd)
+        try:
+            TrafficGenerator.write_routefile(self.demand(name, version), tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        for file_name in os.listdir(self._route_dir):  # the files of the previous contents of the scenario
+            if file_name.startswith(prefix) and len(file_name) == len(os.path.basename(path)) and file_name != os.path.basename(path):
+                os.remove(os.path.join(self._route_dir, file_name))
+        return path
+
+    # NAMES OF THE AVAILABLE SCENARIOS
+    def names(self):
+        return sorted(set(name for name, _ in self._scenarios))
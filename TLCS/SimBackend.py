@@ -0,0 +1,37 @@
+import traci
+
+BACKENDS = ("traci", "libsumo")
+
+
+# HANDLE HOW SUMO IS RUN, RETURNING A CONNECTION WITH THE TRACI API
+# "traci"   -> sumo runs in a separate process, every call goes through a socket
+# "libsumo" -> sumo runs inside this process, without the socket round trips; it cannot show the gui and
+#              runs one simulation per process, so it falls back to traci when the gui is requested or it is not installed
+class SimBackend:
+    def __init__(self, name="traci", gui=False):
+        if name not in BACKENDS:
+            raise ValueError("unknown sumo backend '{}', expected one of {}".format(name, BACKENDS))
+        self._module = traci
+        if name == "libsumo" and gui:
+            print("libsumo cannot show the sumo gui, using traci")
+            name = "traci"
+        if name == "libsumo":
+            try:
+                import libsumo
+                self._module = libsumo
+            except ImportError:
+                print("libsumo is not available, using traci")
+                name = "traci"
+        self._name = name
+
+    # START SUMO WITH sumoCmd AND RETURN THE CONNECTION TO IT - label tells apart the traci connections of one process
+    def start(self, sumoCmd, label="default"):
+        if self._name == "libsumo":
+            self._module.start(sumoCmd)
+            return self._module  # the module itself has the API of a connection
+        self._module.start(sumoCmd, label=label)
+        return self._module.getConnection(label)
+
+    @property
+    def name(self):
+        return self._name
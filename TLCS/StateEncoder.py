@@ -0,0 +1,67 @@
+import numpy as np
+
+from NetTopology import NetTopology
+
+# distance in meters from the TLS where every cell ends: 10 cells per lane group, the last one goes up to the end of the lane
+CELL_BOUNDS = [7, 14, 21, 28, 40, 60, 100, 160, 400]
+
+
+# HANDLE THE DISCRETIZATION OF THE VEHICLES POSITIONS INTO THE CELLS OF THE STATE
+# the lane -> group table and the lane lengths come from the topology of the traffic light (see NetTopology),
+# then the cells of all the vehicles are found with a single np.searchsorted call
+class StateEncoder:
+    def __init__(self, topology=None, tl_id=None, cell_bounds=CELL_BOUNDS, grouping=None):
+        topology = topology if topology is not None else NetTopology.load()
+        tl_id = tl_id if tl_id is not None else topology.traffic_lights[0]
+        self._cell_bounds = np.asarray(cell_bounds, dtype=np.float64)
+        self._num_cells = len(cell_bounds) + 1
+        self._lane_to_group = {}
+        self._lane_length = {}
+        self._build_lane_table(topology, tl_id, grouping)
+        self._num_groups = len(set(self._lane_to_group.values()))
+
+    # ASSIGN EVERY INCOMING LANE OF THE TRAFFIC LIGHT TO ITS GROUP - the groups of the topology, or the ones of grouping if given
+    def _build_lane_table(self, topology, tl_id, grouping):
+        lane_ids, lane_edges, lane_groups, lane_lengths = topology.lanes(tl_id)
+        self._lane_length = dict(zip(lane_ids, lane_lengths.tolist()))
+        if grouping is None:
+            self._lane_to_group = dict(zip(lane_ids, lane_groups.tolist()))
+            return
+
+        group = 0
+        for edge_id in topology.incoming_edges(tl_id):
+            edge_lanes = sorted((lane_id for lane_id, lane_edge in zip(lane_ids, lane_edges) if lane_edge == edge_id), key=lambda lane_id: int(lane_id.rsplit("_", 1)[1]))
+            for lane_group in grouping(edge_lanes):
+                for lane_id in lane_group:
+                    self._lane_to_group[lane_id] = group
+                group += 1
+
+    # RETURN THE INDEX IN THE STATE VECTOR OF EVERY VEHICLE, AND A MASK OF THE VEHICLES IN INCOMING LANES
+    def cell_indexes(self, lane_ids, lane_positions):
+        groups = np.fromiter((self._lane_to_group.get(lane_id, -1) for lane_id in lane_ids), dtype=np.int64, count=len(lane_ids))
+        lengths = np.fromiter((self._lane_length.get(lane_id, 0.0) for lane_id in lane_ids), dtype=np.float64, count=len(lane_ids))
+        distances = lengths - np.asarray(lane_positions, dtype=np.float64)  # inversion of lane pos, so if the car is close to TL, distance = 0
+        cells = np.searchsorted(self._cell_bounds, distances, side="right")
+        valid = groups >= 0  # cars crossing the intersection or driving away from it are not considered
+        return groups * self._num_cells + cells, valid
+
+    # PRESENCE STATE: 1 IF THERE IS AT LEAST ONE VEHICLE IN THE CELL
+    def presence(self, lane_ids, lane_positions):
+        indexes, valid = self.cell_indexes(lane_ids, lane_positions)
+        state = np.zeros(self.num_states)
+        state[indexes[valid]] = 1
+        return state
+
+    # NUMBER OF VEHICLES IN EVERY CELL, OR SUM OF values (e.g. speeds) IF GIVEN
+    def accumulate(self, lane_ids, lane_positions, values=None):
+        indexes, valid = self.cell_indexes(lane_ids, lane_positions)
+        weights = None if values is None else np.asarray(values, dtype=np.float64)[valid]
+        return np.bincount(indexes[valid], weights=weights, minlength=self.num_states).astype(np.float64)
+
+    @property
+    def num_states(self):
+        return self._num_groups * self._num_cells
+
+    @property
+    def lane_to_group(self):
+        return self._lane_to_group
@@ -0,0 +1,67 @@
+from IntersectionSim import IntersectionSim
+from SimBackend import SimBackend
+from TrafficGenerator import TrafficGenerator
+
+
+# THE SIMULATION OF ONE INTERSECTION AS AN ENVIRONMENT: reset(seed) STARTS AN EPISODE, step(action) APPLIES ONE ACTION
+# the state, the reward (change of the cumulative waiting time) and the phases are the ones of SimRunner, both drive an
+# IntersectionSim, without any training here, so that any learner can drive it. env_id tells apart the environments of one run:
+# every one has its own route file and its own sumo instance, through a labeled traci connection or libsumo (see SimBackend);
+# VecEnv steps several of them
+class TrafficEnv(IntersectionSim):
+    def __init__(self, sumoCmd, max_steps, green_duration, yellow_duration, env_id=0, topology=None, route_cache=None, fast_forward=False, backend_name="traci"):
+        # the backend is built here, an environment in a subprocess runs its own sumo
+        super().__init__(max_steps, green_duration, yellow_duration, backend=SimBackend(backend_name), topology=topology, fast_forward=fast_forward, label="env_{}".format(env_id))
+        self._traffic_gen = TrafficGenerator(max_steps, route_file="intersection/tlcs_train_worker_{}.rou.xml".format(env_id), route_cache=route_cache)
+        self._sumoCmd = sumoCmd
+        self._old_action = None
+        self._old_total_wait = 0
+
+    # START A NEW EPISODE WITH THE ROUTES GENERATED FROM seed, RETURN THE FIRST STATE
+    def reset(self, seed):
+        self.close()
+        route_file = self._traffic_gen.generate_routefile(seed)
+        if self._fast_forward:
+            self._departures = self._traffic_gen.generate_demand(seed)["depart"]
+        self._start_sumo(self._sumoCmd + ["--route-files", route_file])
+        self._old_action = None
+        self._update_snapshot()
+        self._old_total_wait = self._get_waiting_times()
+        return self._get_state()
+
+    # ACTIVATE THE PHASE OF action AND SIMULATE IT, RETURN (next_state, reward, done, info)
+    # info has the steps simulated, the halting cars at the last step ("queue") and the cumulative waiting time
+    def step(self, action):
+        action = int(action)  # libsumo only takes python ints
+        start_step = self._steps
+        if self._old_action is not None and self._old_action != action:
+            self._set_yellow_phase(self._old_action)
+            self._simulate(self._yellow_duration)
+        self._set_green_phase(action)
+        self._simulate(self._green_duration)
+        self._old_action = action
+
+        self._update_snapshot()
+        next_state = self._get_state()
+        total_wait = self._get_waiting_times()
+        reward = self._old_total_wait - total_wait
+        self._old_total_wait = total_wait
+        info = {"steps": self._steps - start_step, "queue": self._get_stats(), "waiting_time": total_wait}
+        return next_state, reward, self._steps >= self._max_steps, info
+
+    def close(self):
+        if self._conn is not None:
+            self._close_sumo()
+
+    @property
+    def num_states(self):
+        return self._state_encoder.num_states
+
+    @property
+    def num_actions(self):
+        return len(self._green_phases)
+
+    # HALTING CARS SUMMED OVER EVERY STEP OF THE EPISODE
+    @property
+    def sum_intersection_queue(self):
+        return self._sum_intersection_queue
@@ -1,78 +1,72 @@
 import numpy as np
 import math
 
+# routes of the intersection, as (route id, edges)
+STRAIGHT_ROUTES = [("W_E", "W2TL TL2E"), ("E_W", "E2TL TL2W"), ("N_S", "N2TL TL2S"), ("S_N", "S2TL TL2N")]
+TURN_ROUTES = [("W_N", "W2TL TL2N"), ("W_S", "W2TL TL2S"), ("N_W", "N2TL TL2W"), ("N_E", "N2TL TL2E"),
+               ("E_N", "E2TL TL2N"), ("E_S", "E2TL TL2S"), ("S_W", "S2TL TL2W"), ("S_E", "S2TL TL2E")]
+ROUTES = STRAIGHT_ROUTES + TURN_ROUTES
+ROUTE_IDS = np.array([route_id for route_id, _ in ROUTES])
+
+# one row per vehicle: departure step and index of its route in ROUTES
+DEMAND_DTYPE = np.dtype([("depart", np.float64), ("route", np.int16)])
+
+ROUTES_HEADER = """<routes>
+    <vType accel="1.0" decel="4.5" id="standard_car" length="5.0" minGap="2.5" maxSpeed="25" sigma="0.5" />
+
+""" + "\n".join('    <route id="{}" edges="{}"/>'.format(route_id, edges) for route_id, edges in ROUTES)
+VEHICLE_LINE = '    <vehicle id="%s_%i" type="standard_car" route="%s" depart="%.1f" departLane="random" departSpeed="10" />'
+
+
 # HANDLE THE GENERATION OF VEHICLES IN ONE EPISODE
 class TrafficGenerator:
-    def __init__(self, max_steps):
-        self._n_cars_generated = 1000  # how many cars per episode
+    def __init__(self, max_steps, route_file="intersection/tlcs_train.rou.xml", n_cars_generated=1000, straight_ratio=0.75, route_cache=None):
+        self._n_cars_generated = n_cars_generated  # how many cars per episode
         self._max_steps = max_steps
+        self._route_file = route_file
+        self._straight_ratio = straight_ratio  # how many cars go straight, the others turn left or right
+        self._route_cache = route_cache  # if given, the route files are taken from the cache instead of route_file
 
-    # generation of routes of cars
-    def generate_routefile(self, seed):
-        np.random.seed(seed)  # make tests reproducible
+    # generation of the demand of one episode, as a structured array of DEMAND_DTYPE sorted by departure
+    def generate_demand(self, seed):
+        rng = np.random.RandomState(seed)  # make tests reproducible
 
         # the generation of cars is distributed according to a weibull distribution
-        timings = np.random.weibull(2, self._n_cars_generated)
-        timings = np.sort(timings)
+        timings = np.sort(rng.weibull(2, self._n_cars_generated))
 
-        # reshape the distribution to fit the interval 0:max_steps
-        car_gen_steps = []
+        # reshape the distribution to fit the interval 0:max_steps, and round every value to int -> effective steps when a car will be generated
         min_old = math.floor(timings[1])
         max_old = math.ceil(timings[-1])
         min_new = 0
         max_new = self._max_steps
-        for value in timings:
-            car_gen_steps = np.append(car_gen_steps, ((max_new - min_new) / (max_old - min_old)) * (value - max_old) + max_new)
+        car_gen_steps = np.rint(((max_new - min_new) / (max_old - min_old)) * (timings - max_old) + max_new)
 
-        car_gen_steps = np.rint(car_gen_steps)  # round every value to int -> effective steps when a car will be generated
+        # choose direction: straight or turn, then a random source & destination among the routes of that kind
+        straight = rng.uniform(size=self._n_cars_generated) < self._straight_ratio
+        route_straight = rng.randint(0, len(STRAIGHT_ROUTES), self._n_cars_generated)
+        route_turn = len(STRAIGHT_ROUTES) + rng.randint(0, len(TURN_ROUTES), self._n_cars_generated)
 
-        # produce the file for cars generation, one car per line
-        with open("intersection/tlcs_train.rou.xml", "w") as routes:
-            print("""<routes>
-            <vType accel="1.0" decel="4.5" id="standard_car" length="5.0" minGap="2.5" maxSpeed="25" sigma="0.5" />
+        demand = np.empty(self._n_cars_generated, dtype=DEMAND_DTYPE)
+        demand["depart"] = car_gen_steps
+        demand["route"] = np.where(straight, route_straight, route_turn)
+        return demand
 
-            <route id="W_N" edges="W2TL TL2N"/>
-            <route id="W_E" edges="W2TL TL2E"/>
-            <route id="W_S" edges="W2TL TL2S"/>
-            <route id="N_W" edges="N2TL TL2W"/>
-            <route id="N_E" edges="N2TL TL2E"/>
-            <route id="N_S" edges="N2TL TL2S"/>
-            <route id="E_W" edges="E2TL TL2W"/>
-            <route id="E_N" edges="E2TL TL2N"/>
-            <route id="E_S" edges="E2TL TL2S"/>
-            <route id="S_W" edges="S2TL TL2W"/>
-            <route id="S_N" edges="S2TL TL2N"/>
-            <route id="S_E" edges="S2TL TL2E"/>""", file=routes)
+    # generation of routes of cars, returns the path of the route file to give to sumo
+    def generate_routefile(self, seed):
+        if self._route_cache is not None:
+            key = (seed, self._n_cars_generated, self._max_steps, self._straight_ratio)
+            return self._route_cache.get(key, lambda path: self.write_routefile(self.generate_demand(seed), path))
+        self.write_routefile(self.generate_demand(seed), self._route_file)
+        return self._route_file
 
-            for car_counter, step in enumerate(car_gen_steps):
-                straight_or_turn = np.random.uniform()
-                if straight_or_turn < 0.75:  # choose direction: straight or turn - 75% of times the car goes straight
-                    route_straight = np.random.randint(1, 5)  # choose a random source & destination
-                    if route_straight == 1:
-                        print('    <vehicle id="W_E_%i" type="standard_car" route="W_E" depart="%s" departLane="random" departSpeed="10" />' % (car_counter, step), file=routes)
-                    elif route_straight == 2:
-                        print('    <vehicle id="E_W_%i" type="standard_car" route="E_W" depart="%s" departLane="random" departSpeed="10" />' % (car_counter, step), file=routes)
-                    elif route_straight == 3:
-                        print('    <vehicle id="N_S_%i" type="standard_car" route="N_S" depart="%s" departLane="random" departSpeed="10" />' % (car_counter, step), file=routes)
-                    else:
-                        print('    <vehicle id="S_N_%i" type="standard_car" route="S_N" depart="%s" departLane="random" departSpeed="10" />' % (car_counter, step), file=routes)
-                else:  # car that turn -25% of the time the car turns
-                    route_turn = np.random.randint(1, 9)  # choose random source source & destination
-                    if route_turn == 1:
-                        print('    <vehicle id="W_N_%i" type="standard_car" route="W_N" depart="%s" departLane="random" departSpeed="10" />' % (car_counter, step), file=routes)
-                    elif route_turn == 2:
-                        print('    <vehicle id="W_S_%i" type="standard_car" route="W_S" depart="%s" departLane="random" departSpeed="10" />' % (car_counter, step), file=routes)
-                    elif route_turn == 3:
-                        print('    <vehicle id="N_W_%i" type="standard_car" route="N_W" depart="%s" departLane="random" departSpeed="10" />' % (car_counter, step), file=routes)
-                    elif route_turn == 4:
-                        print('    <vehicle id="N_E_%i" type="standard_car" route="N_E" depart="%s" departLane="random" departSpeed="10" />' % (car_counter, step), file=routes)
-                    elif route_turn == 5:
-                        print('    <vehicle id="E_N_%i" type="standard_car" route="E_N" depart="%s" departLane="random" departSpeed="10" />' % (car_counter, step), file=routes)
-                    elif route_turn == 6:
-                        print('    <vehicle id="E_S_%i" type="standard_car" route="E_S" depart="%s" departLane="random" departSpeed="10" />' % (car_counter, step), file=routes)
-                    elif route_turn == 7:
-                        print('    <vehicle id="S_W_%i" type="standard_car" route="S_W" depart="%s" departLane="random" departSpeed="10" />' % (car_counter, step), file=routes)
-                    elif route_turn == 8:
-                        print('    <vehicle id="S_E_%i" type="standard_car" route="S_E" depart="%s" departLane="random" departSpeed="10" />' % (car_counter, step), file=routes)
+    # produce the file for cars generation, one car per line, with a single write
+    @staticmethod
+    def write_routefile(demand, route_file):
+        route_ids = ROUTE_IDS[demand["route"]]
+        lines = [VEHICLE_LINE % (route_id, car_counter, route_id, step) for car_counter, (route_id, step) in enumerate(zip(route_ids.tolist(), demand["depart"].tolist()))]
+        with open(route_file, "w") as routes:
+            routes.write(ROUTES_HEADER + "\n" + "\n".join(lines) + "\n</routes>\n")
 
-            print("</routes>", file=routes)
+    @property
+    def route_file(self):
+        return self._route_file
@@ -0,0 +1,128 @@
+import multiprocessing as mp
+
+import numpy as np
+
+from IntersectionSim import with_waiting_time_memory
+from NetTopology import NetTopology
+from StateEncoder import StateEncoder
+from TrafficEnv import TrafficEnv
+
+
+# MAIN LOOP OF A SUBPROCESS: BUILD ONE ENVIRONMENT AND EXECUTE THE COMMANDS RECEIVED FROM THE PIPE
+def _worker(pipe, env_kwargs):
+    env = TrafficEnv(**env_kwargs)
+    try:
+        while True:
+            command, data = pipe.recv()
+            if command == "reset":
+                pipe.send(env.reset(data))
+            elif command == "step":
+                pipe.send(env.step(data))
+            elif command == "queue":
+                pipe.send(env.sum_intersection_queue)
+            elif command == "close":
+                break
+    finally:
+        env.close()
+        pipe.close()
+
+
+# HANDLE n_envs TrafficEnv STEPPED IN LOCKSTEP, THE STATES, REWARDS, DONE FLAGS AND INFOS COME BACK AS STACKED ARRAYS
+# subprocess=True  -> every environment lives in its own spawned process, so the sumo instances simulate in parallel
+#                     and the caller can work (e.g. train) between step_async and step_wait
+# subprocess=False -> the environments are stepped one after the other in this process, with traci only: libsumo runs one simulation per process
+# the optional indexes select the environments a call applies to, e.g. the ones whose episode is not done yet
+class VecEnv:
+    def __init__(self, n_envs, sumoCmd, max_steps, green_duration, yellow_duration, topology=None, route_cache=None, fast_forward=False, backend_name="traci", subprocess=True):
+        if not subprocess and n_envs > 1 and backend_name == "libsumo":
+            raise ValueError("libsumo runs one simulation per process, use subprocess=True or the traci backend")
+        topology = topology if topology is not None else NetTopology.load()
+        sumoCmd = with_waiting_time_memory(sumoCmd, max_steps)  # checked here, an error in a subprocess would only close its pipe
+        self._n_envs = n_envs
+        self._num_states = StateEncoder(topology).num_states
+        self._num_actions = topology.num_actions(topology.traffic_lights[0])
+        self._subprocess = subprocess
+        self._envs = []
+        self._pipes = []
+        self._processes = []
+        self._pending = None  # (indexes, actions) of the step sent by step_async
+        ctx = mp.get_context("spawn")  # spawned, not forked, so that the subprocesses do not inherit the tensorflow session
+        for env_id in range(n_envs):
+            env_kwargs = {"sumoCmd": sumoCmd, "max_steps": max_steps, "green_duration": green_duration, "yellow_duration": yellow_duration, "env_id": env_id,
+                          "topology": topology, "route_cache": route_cache, "fast_forward": fast_forward, "backend_name": backend_name}
+            if not subprocess:
+                self._envs.append(TrafficEnv(**env_kwargs))
+                continue
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(target=_worker, args=(child_pipe, env_kwargs), daemon=True)
+            process.start()
+            child_pipe.close()
+            self._pipes.append(parent_pipe)
+            self._processes.append(process)
+
+    def _indexes(self, indexes):
+        return list(range(self._n_envs)) if indexes is None else list(indexes)
+
+    # SEND THE SAME COMMAND WITH ONE VALUE PER ENVIRONMENT, RETURN THE LIST OF THE RESULTS
+    def _call(self, command, values, indexes):
+        if not self._subprocess:
+            return [getattr(self._envs[i], command)(value) for i, value in zip(indexes, values)]
+        for i, value in zip(indexes, values):
+            self._pipes[i].send((command, value))
+        return [self._pipes[i].recv() for i in indexes]
+
+    # START A NEW EPISODE IN EVERY ENVIRONMENT, WITH ONE SEED EACH, RETURN THE FIRST STATES AS A [n, num_states] ARRAY
+    def reset(self, seeds, indexes=None):
+        return np.array(self._call("reset", seeds, self._indexes(indexes)))
+
+    # SEND ONE ACTION TO EVERY ENVIRONMENT, WITHOUT WAITING FOR THE SIMULATION
+    def step_async(self, actions, indexes=None):
+        indexes = self._indexes(indexes)
+        if self._subprocess:
+            for i, action in zip(indexes, actions):
+                self._pipes[i].send(("step", int(action)))
+        self._pending = (indexes, actions)
+
+    # WAIT FOR THE STEP SENT BY step_async, RETURN (states, rewards, dones, infos), infos IS A DICT OF ARRAYS
+    def step_wait(self):
+        indexes, actions = self._pending
+        self._pending = None
+        if self._subprocess:
+            results = [self._pipes[i].recv() for i in indexes]
+        else:
+            results = [self._envs[i].step(action) for i, action in zip(indexes, actions)]
+        states, rewards, dones, infos = zip(*results)
+        return (np.array(states), np.array(rewards, dtype=np.float64), np.array(dones, dtype=bool),
+                {key: np.array([info[key] for info in infos]) for key in infos[0]})
+
+    def step(self, actions, indexes=None):
+        self.step_async(actions, indexes)
+        return self.step_wait()
+
+    # HALTING CARS SUMMED OVER EVERY STEP OF THE CURRENT EPISODE, ONE VALUE PER ENVIRONMENT
+    def sum_intersection_queues(self, indexes=None):
+        indexes = self._indexes(indexes)
+        if not self._subprocess:
+            return np.array([self._envs[i].sum_intersection_queue for i in indexes])
+        return np.array(self._call("queue", [None] * len(indexes), indexes))
+
+    # STOP THE ENVIRONMENTS AND THEIR SUMO INSTANCES
+    def close(self):
+        for env in self._envs:
+            env.close()
+        for pipe in self._pipes:
+            pipe.send(("close", None))
+        for process in self._processes:
+            process.join()
+
+    @property
+    def num_envs(self):
+        return self._n_envs
+
+    @property
+    def num_states(self):
+        return self._num_states
+
+    @property
+    def num_actions(self):
+        return self._num_actions
@@ -0,0 +1,43 @@
+import traci.constants as tc
+
+
+# HANDLE THE CUMULATIVE WAITING TIME OF THE CARS IN THE INCOMING ROADS AS A RUNNING TOTAL, UPDATED AFTER EVERY STEP
+# sumo adds the step length to the accumulated waiting time of every car slower than 0.1 m/s, the same threshold of the
+# halting number of the edges: every step adds the halting cars of the incoming roads to the total, the cars entering
+# the roads bring the waiting time they already have and the cars leaving them take away the one they accumulated.
+# only the cars that entered or left during the step are read, one call each; the roads must be subscribed to EDGE_VARS
+# sumo must run with a --waiting-time-memory of at least the episode length (IntersectionSim adds it): with a shorter one,
+# the waiting time of a car leaving is capped at the memory, while the total kept every second it halted
+class WaitingTimeTracker:
+    def __init__(self, incoming_roads, step_length=1.0):
+        self._incoming_roads = incoming_roads
+        self._step_length = step_length
+        self._on_roads = set()  # the cars in the incoming roads at the last step
+        self._total = 0.0
+
+    # FORGET THE CARS OF THE PREVIOUS EPISODE
+    def reset(self):
+        self._on_roads = set()
+        self._total = 0.0
+
+    # UPDATE THE TOTAL AFTER ONE SIMULATION STEP, FROM THE SUBSCRIPTION RESULTS OF THE INCOMING ROADS
+    def update(self, conn):
+        on_roads = set()
+        halting = 0
+        for road_id in self._incoming_roads:
+            results = conn.edge.getSubscriptionResults(road_id)
+            halting += results[tc.LAST_STEP_VEHICLE_HALTING_NUMBER]
+            on_roads.update(results[tc.LAST_STEP_VEHICLE_ID_LIST])
+
+        # a car that changed road during the step moved, so its waiting time did not grow in the step: a car entering brings
+        # the waiting time of its previous roads, a car leaving takes away the one accumulated in the incoming roads
+        for veh_id in on_roads - self._on_roads:
+            self._total += conn.vehicle.getAccumulatedWaitingTime(veh_id)
+        for veh_id in self._on_roads - on_roads:
+            self._total -= conn.vehicle.getAccumulatedWaitingTime(veh_id)
+        self._total += halting * self._step_length
+        self._on_roads = on_roads
+
+    @property
+    def total(self):
+        return self._total
@@ -0,0 +1,160 @@
+from __future__ import absolute_import
+from __future__ import print_function
+
+import os
+import sys
+# sumo things - we need to import python modules from the $SUMO_HOME/tools directory
+if 'SUMO_HOME' in os.environ:
+    tools = os.path.join(os.environ['SUMO_HOME'], 'tools')
+    sys.path.append(tools)
+else:
+    sys.exit("please declare environment variable 'SUMO_HOME'")
+from sumolib import checkBinary
+import csv
+import datetime
+import json
+import tensorflow as tf
+import numpy as np
+
+from BenchmarkRunner import BenchmarkRunner, PHASES
+from TrafficGenerator import TrafficGenerator
+from Memory import Memory
+from Model import Model
+from ReplayScheduler import ReplayScheduler
+from ScenarioRegistry import ScenarioRegistry
+from SimBackend import SimBackend
+
+
+# RUN ONE EPISODE OF EVERY SCENARIO WITH EVERY SEED, RETURN THE TIMINGS OF EVERY CASE
+# the demand is fixed by the scenario, the seed drives the exploration of the agent
+def run_cases(sess, model, config, backend):
+    registry = ScenarioRegistry()
+    cases = []
+    for name in config["scenarios"]:
+        scenario = registry.get(name)
+        max_steps = scenario["max_steps"]
+        sumoCmd = [checkBinary('sumo'), "-c", "intersection/tlcs_config_train.sumocfg", "--no-step-log", "true", "--waiting-time-memory", str(max_steps)]
+        if scenario["type"] == "synthetic":  # the route file is generated, and timed, in the episode
+            traffic_gen = TrafficGenerator(max_steps, route_file="intersection/tlcs_benchmark.rou.xml", n_cars_generated=scenario["n_cars"], straight_ratio=scenario["straight_ratio"])
+            demo = False
+        else:  # recorded demand, written once by the registry
+            traffic_gen = None
+            sumoCmd += ["--route-files", registry.route_file(name)]
+            demo = True
+
+        for seed in config["seeds"]:
+            print("----- Scenario {} v{}, seed {}".format(name, scenario["version"], seed))
+            np.random.seed(seed)
+            sess.run(model.var_init)
+            memory = Memory(config["memory_size"], model.num_states)
+            replay_scheduler = ReplayScheduler(config["replay_mode"], config["replay_every_n_steps"])
+            runner = BenchmarkRunner(sess, model, memory, traffic_gen, 2, config["gamma"], max_steps, config["green_duration"], config["yellow_duration"], sumoCmd,
+                                     demo=demo, replay_scheduler=replay_scheduler, prefetch_batches=config["prefetch_batches"], fast_forward=config["fast_forward"], backend=backend)
+            timings = runner.run(1, scenario.get("seed"))  # episode 1 of 2 -> epsilon 0.5
+            runner.stop_training()
+            cases.append(dict(scenario=name, version=scenario["version"], seed=seed, max_steps=max_steps, **timings))
+            print("Episode time: {:.2f}s".format(timings["episode_time"]))
+    return cases
+
+
+# SUM THE TIMINGS OF THE CASES, PHASE BY PHASE - "other" IS THE TIME OUTSIDE THE TIMED PHASES
+# a phase missing from a case (timed since the case was measured) is left out, so its time is counted in "other"
+def summarize(cases, phases=PHASES):
+    phases = [phase for phase in phases if all(phase in case["phases"] for case in cases)]
+    summary = {phase: sum(case["phases"][phase]["total"] for case in cases) for phase in phases}
+    summary["episode_time"] = sum(case["episode_time"] for case in cases)
+    summary["other"] = summary["episode_time"] - sum(summary[phase] for phase in phases)
+    return summary
+
+
+# SAVE THE RESULTS AS JSON, AND AS CSV WITH ONE ROW PER CASE AND PHASE
+def save_results(results, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".json", "w") as file:
+        json.dump(results, file, indent=2)
+    with open(path + ".csv", "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["scenario", "version", "seed", "phase", "total_s", "calls", "mean_ms"])
+        for case in results["cases"]:
+            for phase in PHASES:
+                total, calls = case["phases"][phase]["total"], case["phases"][phase]["calls"]
+                writer.writerow([case["scenario"], case["version"], case["seed"], phase, "%.6f" % total, calls, "%.4f" % (1000 * total / calls if calls else 0)])
+            writer.writerow([case["scenario"], case["version"], case["seed"], "episode", "%.6f" % case["episode_time"], 1, "%.4f" % (1000 * case["episode_time"])])
+
+
+# COMPARE THE RESULTS WITH THE BASELINE ON THE CASES FOUND IN BOTH, RETURN THE PHASES THAT GOT SLOWER
+# a phase regresses if it takes more than tolerance times the baseline and more than min_seconds longer
+def compare(results, baseline, tolerance, min_seconds):
+    if results["config"] != baseline["config"]:
+        print("Warning: the baseline was measured with a different configuration")
+    baseline_cases = {(case["scenario"], case["version"], case["seed"]): case for case in baseline["cases"]}
+    current = [case for case in results["cases"] if (case["scenario"], case["version"], case["seed"]) in baseline_cases]
+    if not current:
+        print("No case in common with the baseline")
+        return []
+    baseline_summary = summarize([baseline_cases[(case["scenario"], case["version"], case["seed"])] for case in current])
+    phases = [phase for phase in PHASES if phase in baseline_summary]  # the phases the baseline timed, the others are in "other" on both sides
+    current_summary = summarize(current, phases)
+
+    regressions = []
+    print("{:<20}{:>12}{:>12}{:>9}".format("phase", "baseline s", "current s", "ratio"))
+    for phase in phases + ["other", "episode_time"]:
+        old, new = baseline_summary[phase], current_summary[phase]
+        ratio = new / old if old > 0 else float("inf") if new > 0 else 1.0
+        regressed = ratio > tolerance and new - old > min_seconds
+        if regressed:
+            regressions.append(phase)
+        print("{:<20}{:>12.3f}{:>12.3f}{:>9.2f}{}".format(phase, old, new, ratio, "  <-- slower" if regressed else ""))
+    return regressions
+
+
+if __name__ == "__main__":
+
+    # --- BENCHMARK OPTIONS ---
+    scenarios = ["train", "demo"]  # fixed demands, see the scenarios folder
+    seeds = [0, 1]  # seeds of the exploration of the agent
+    sumo_backend = "libsumo"
+    fast_forward = True
+    replay_mode = "step"  # "step", "decision" or "episode" - with "async" the training overlaps the other phases
+    replay_every_n_steps = 1
+    prefetch_batches = 0
+    gamma = 0.75
+    batch_size = 100
+    memory_size = 50000
+    results_path = "./benchmark/results"  # .json and .csv are appended
+    baseline_path = "./benchmark/baseline.json"  # written by the first run, then compared against
+    update_baseline = False  # replace the baseline with the results of this run
+    tolerance = 1.15  # slowdown ratio over the baseline that is reported as a regression...
+    min_seconds = 0.05  # ...if the phase is also this much slower, so that tiny phases do not trigger on noise
+    # ----------------------
+
+    # attributes of the agent
+    num_states = 80
+    num_actions = 4
+    green_duration = 10
+    yellow_duration = 4
+
+    config = dict(scenarios=scenarios, seeds=seeds, sumo_backend=sumo_backend, fast_forward=fast_forward, replay_mode=replay_mode,
+                  replay_every_n_steps=replay_every_n_steps, prefetch_batches=prefetch_batches, gamma=gamma, batch_size=batch_size,
+                  memory_size=memory_size, green_duration=green_duration, yellow_duration=yellow_duration)
+
+    tf.set_random_seed(0)
+    model = Model(num_states, num_actions, batch_size)
+    backend = SimBackend(sumo_backend)
+
+    with tf.Session() as sess:
+        cases = run_cases(sess, model, config, backend)
+
+    results = {"created": datetime.datetime.now().isoformat(), "config": config, "cases": cases, "summary": summarize(cases)}
+    save_results(results, results_path)
+    print("Results saved in {}.json and {}.csv".format(results_path, results_path))
+
+    if update_baseline or not os.path.exists(baseline_path):
+        with open(baseline_path, "w") as file:
+            json.dump(results, file, indent=2)
+        print("Baseline saved in", baseline_path)
+    else:
+        with open(baseline_path) as file:
+            regressions = compare(results, json.load(file), tolerance, min_seconds)
+        if regressions:
+            sys.exit("Slower than the baseline: " + ", ".join(regressions))
@@ -24,6 +24,8 @@ from SimRunner import SimRunner
 from TrafficGenerator import TrafficGenerator
 from Memory import Memory
 from Model import Model
+from ScenarioRegistry import ScenarioRegistry
+from SimBackend import SimBackend
 
 
 # PLOT AND SAVE THE STATS ABOUT THE SESSION
@@ -88,17 +90,20 @@ if __name__ == "__main__":
 
     # --- TRAINING OPTIONS ---
     gui = True
+    sumo_backend = "libsumo"  # "traci" or "libsumo", see tlcs_main.py - with the gui, traci is always used
     total_episodes = 100
     gamma = 0.75
     batch_size = 100
     memory_size = 50000
     path = "./model/model/model_1_5x400_100e_075g/"  # nn = 5x400, episodes = 300, gamma = 0.75
+    scenario = "demo"  # demand scenario to evaluate, see the scenarios folder
     # ----------------------
 
     # attributes of the agent
     num_states = 80
     num_actions = 4
-    max_steps = 1800  # seconds = 1 h 30 min each episode
+    scenarios = ScenarioRegistry()
+    max_steps = scenarios.get(scenario)["max_steps"]  # seconds of the scenario
     green_duration = 10
     yellow_duration = 4
 
@@ -110,21 +115,22 @@ if __name__ == "__main__":
 
     # initializations
     model = Model(num_states, num_actions, batch_size)
-    memory = Memory(memory_size)
+    memory = Memory(memory_size, num_states)
     traffic_gen = TrafficGenerator(max_steps)
-    sumoCmd = [sumoBinary, "-c", "intersection/tlcs_config_train.sumocfg", "--no-step-log", "true", "--waiting-time-memory", str(max_steps)]
+    backend = SimBackend(sumo_backend, gui)
+    sumoCmd = [sumoBinary, "-c", "intersection/tlcs_config_train.sumocfg", "--no-step-log", "true", "--waiting-time-memory", str(max_steps), "--route-files", scenarios.route_file(scenario)]
     saver = tf.train.Saver()
 
     with tf.Session() as sess:
         saver.restore(sess, path + "my_tlcs_model.ckpt")
-        sim_runner = SimRunner(sess, model, memory, traffic_gen, 1, gamma, max_steps, green_duration, yellow_duration, sumoCmd, demo=True)
+        sim_runner = SimRunner(sess, model, memory, traffic_gen, 1, gamma, max_steps, green_duration, yellow_duration, sumoCmd, demo=True, backend=backend)
         sim_runner.run(1)
         print("Wait time with model:",sim_runner.cumulative_wait_store[0])
         print("Avg queue length with model:",sim_runner.avg_intersection_queue_store[0])
 
     ##Primitive Traffic light, without model, round robin
 
-    sim_runner = SimRunner(sess, model, memory, traffic_gen, 1, gamma, max_steps, green_duration, yellow_duration, sumoCmd, demo=True)
+    sim_runner = SimRunner(sess, model, memory, traffic_gen, 1, gamma, max_steps, green_duration, yellow_duration, sumoCmd, demo=True, backend=backend)
     sim_runner.run_modelless()
     print("Wait time with model:",sim_runner.cumulative_wait_store[0])
     print("Avg queue length with model:",sim_runner.avg_intersection_queue_store[0])
@@ -21,9 +21,21 @@ import math
 import timeit
 
 from SimRunner import SimRunner
+from ParallelRunner import ParallelRunner
+from MultiRunner import MultiRunner
+from NetTopology import NetTopology
+from StateEncoder import StateEncoder
 from TrafficGenerator import TrafficGenerator
 from Memory import Memory
+from PrioritizedMemory import PrioritizedMemory
 from Model import Model
+from ReplayScheduler import ReplayScheduler
+from RouteCache import RouteCache
+from SimBackend import SimBackend
+from Metrics import Metrics
+from MetricsExporter import MetricsExporter
+from DecisionLogger import DecisionLogger
+from Checkpointer import Checkpointer
 
 
 # PLOT AND SAVE THE STATS ABOUT THE SESSION
@@ -88,16 +100,44 @@ if __name__ == "__main__":
 
     # --- TRAINING OPTIONS ---
     gui = False
+    sumo_backend = "libsumo"  # "traci" (sumo in its own process, over a socket) or "libsumo" (sumo inside this process, no gui - traci is used with the gui)
     total_episodes = 100
     gamma = 0.75
     batch_size = 100
     memory_size = 50000
+    target_update = None  # target network: None, "hard" (copy every target_update_steps trainings) or "soft" (Polyak averaging with tau)
+    target_update_steps = 1000
+    tau = 0.005
+    double_dqn = False  # the online network chooses the next action, the target network evaluates it
+    prioritized_replay = False  # sample the memory by TD error instead of uniformly
+    per_alpha = 0.6  # how much the priorities count, 0 = uniform
+    per_beta = 0.4  # initial importance-sampling correction, annealed to 1
+    replay_mode = "step"  # when to train: "step" (every replay_every_n_steps sim steps), "decision" (replay_batches_per_decision batches every action), "episode" (replay_epochs over the memory at the end of every episode) or "async" (in a learner thread beside the simulation, publishing the weights every publish_interval batches)
+    replay_every_n_steps = 1
+    replay_batches_per_decision = 1
+    replay_epochs = 1
+    publish_interval = 100
+    prefetch_batches = 4  # replay batches sampled in advance by a background thread, 0 to sample them inline
+    n_workers = 1  # how many episodes are simulated in parallel, each one in its own sumo process
+    route_cache_dir = "intersection/route_cache"  # generated route files are reused across runs, None to disable
+    route_cache_max_mb = 200
+    fast_forward = True  # when no car is around the intersection, simulate up to the next departure in a single sumo call - single intersection only, False for a network
+    metrics_path = None  # file of the metrics snapshots to monitor the run, e.g. "./metrics/tlcs.prom" - None to disable the metrics
+    metrics_format = "prometheus"  # "prometheus" (text format, replaced at every snapshot) or "jsonl" (one line appended per snapshot)
+    metrics_interval = 10  # seconds between two snapshots
+    log_decisions = True  # stream one record per decision (step, action, reward, queue, waiting time, epsilon, and traffic light of a network) to path/decisions, see DecisionLogger
+    net_file = "intersection/tlcs.net.xml"  # the traffic light, incoming roads and phases are read from it, see NetTopology
+    network_net_file = None  # net file of a network with several traffic lights controlled by one shared agent, e.g. "intersection/Network_1/net_file.net.xml" (see MultiRunner) - None for the single intersection
+    network_config = "intersection/Network_1/config_file.sumocfg.xml"  # sumo configuration of that network, with its own routes
+    checkpoint_every = 10  # episodes between two checkpoints of the training in path/checkpoints, written in the background (see Checkpointer) - None to disable
+    resume = "--resume" in sys.argv  # "python tlcs_main.py --resume" continues the training from the last checkpoint
     path = "./model/model_1_5x400_100e_075g/"  # nn = 5x400, episodes = 300, gamma = 0.75
     # ----------------------
 
     # attributes of the agent
-    num_states = 80
-    num_actions = 4
+    topology = NetTopology.load(net_file if network_net_file is None else network_net_file)
+    num_states = StateEncoder(topology).num_states  # 80 for tlcs.net.xml, every traffic light of a network must have the same
+    num_actions = topology.num_actions(topology.traffic_lights[0])  # 4 for tlcs.net.xml
     max_steps = 5400  # seconds = 1 h 30 min each episode
     green_duration = 10
     yellow_duration = 4
@@ -109,26 +149,67 @@ if __name__ == "__main__":
         sumoBinary = checkBinary('sumo-gui')
 
     # initializations
-    model = Model(num_states, num_actions, batch_size)
-    memory = Memory(memory_size)
-    traffic_gen = TrafficGenerator(max_steps)
-    sumoCmd = [sumoBinary, "-c", "intersection/tlcs_config_train.sumocfg", "--no-step-log", "true", "--waiting-time-memory", str(max_steps)]
+    model = Model(num_states, num_actions, batch_size, target_update, target_update_steps, tau, double_dqn, separate_actor=(replay_mode == "async"))
+    if prioritized_replay:
+        memory = PrioritizedMemory(memory_size, num_states, per_alpha, per_beta)
+    else:
+        memory = Memory(memory_size, num_states)
+    route_cache = RouteCache(route_cache_dir, route_cache_max_mb * 1024 * 1024) if route_cache_dir is not None else None
+    traffic_gen = TrafficGenerator(max_steps, route_cache=route_cache)
+    backend = SimBackend(sumo_backend, gui)
+    metrics = Metrics() if metrics_path is not None else None
+    decision_logger = DecisionLogger(os.path.join(path, "decisions"), append=resume) if log_decisions else None
+    checkpointer = Checkpointer(os.path.join(path, "checkpoints")) if checkpoint_every is not None or resume else None
+    if checkpointer is not None and not resume:  # the checkpoints of an earlier run in path belong to another training
+        checkpointer.clear()
+    replay_scheduler = ReplayScheduler(replay_mode, replay_every_n_steps, replay_batches_per_decision, replay_epochs, publish_interval)
+    sumoCmd = [sumoBinary, "-c", "intersection/tlcs_config_train.sumocfg", "--net-file", net_file, "--no-step-log", "true", "--waiting-time-memory", str(max_steps)]
+    if network_net_file is not None:
+        sumoCmd = [sumoBinary, "-c", network_config, "--no-step-log", "true", "--waiting-time-memory", str(max_steps)]
     saver = tf.train.Saver()
 
     with tf.Session() as sess:
         print("PATH:", path)
         print("----- Start time:", datetime.datetime.now())
         sess.run(model.var_init)
-        sim_runner = SimRunner(sess, model, memory, traffic_gen, total_episodes, gamma, max_steps, green_duration, yellow_duration, sumoCmd)
+        if network_net_file is not None:
+            sim_runner = MultiRunner(sess, model, memory, topology, total_episodes, gamma, max_steps, green_duration, yellow_duration, sumoCmd, replay_scheduler=replay_scheduler, prefetch_batches=prefetch_batches, fast_forward=fast_forward, backend=backend, metrics=metrics, decision_logger=decision_logger)
+        elif n_workers > 1:
+            sim_runner = ParallelRunner(sess, model, memory, n_workers, total_episodes, gamma, max_steps, green_duration, yellow_duration, sumoCmd, replay_scheduler=replay_scheduler, route_cache=route_cache, prefetch_batches=prefetch_batches, fast_forward=fast_forward, backend=backend, metrics=metrics, decision_logger=decision_logger, topology=topology)
+        else:
+            sim_runner = SimRunner(sess, model, memory, traffic_gen, total_episodes, gamma, max_steps, green_duration, yellow_duration, sumoCmd, replay_scheduler=replay_scheduler, prefetch_batches=prefetch_batches, fast_forward=fast_forward, backend=backend, metrics=metrics, decision_logger=decision_logger, topology=topology)
         episode = 0
+        if resume:  # the weights, the optimizer state, the memory, the stats, the random state and the decision log of the last checkpoint
+            episode = checkpointer.restore(sess, model, memory, sim_runner, decision_logger)
+            if episode is None:
+                sys.exit("no checkpoint to resume from in " + os.path.join(path, "checkpoints"))
+            print("----- Resuming after episode", episode)
+        last_checkpoint = episode
+        if metrics is not None:
+            exporter = MetricsExporter(metrics, metrics_path, metrics_interval, metrics_format)
+            exporter.start()
 
         while episode < total_episodes:
-            print('----- Episode {} of {}'.format(episode+1, total_episodes))
+            if isinstance(sim_runner, ParallelRunner):
+                print('----- Episodes {}-{} of {}'.format(episode+1, min(episode + n_workers, total_episodes), total_episodes))
+            else:
+                print('----- Episode {} of {}'.format(episode+1, total_episodes))
             start = timeit.default_timer()
-            sim_runner.run(episode)  # run the simulation
+            episode += sim_runner.run(episode)  # run the simulation
             stop = timeit.default_timer()
             print('Time: ', round(stop - start, 1))
-            episode += 1
+            if checkpoint_every is not None and episode - last_checkpoint >= checkpoint_every and episode < total_episodes:
+                sim_runner.stop_training()  # nothing trains while the state is copied, the next episode restarts the training
+                checkpointer.save(sess, episode, model, memory, sim_runner, decision_logger)
+                last_checkpoint = episode
+
+        sim_runner.stop_training()
+        if checkpointer is not None:
+            checkpointer.wait()
+        if metrics is not None:
+            exporter.stop()
+        if isinstance(sim_runner, ParallelRunner):
+            sim_runner.close()
 
         os.makedirs(os.path.dirname(path), exist_ok=True)
         saver.save(sess, path + "my_tlcs_model.ckpt") 